@@ -0,0 +1,718 @@
+#!/usr/bin/env python3
+"""Build script for the `_flintdb` cffi extension (out-of-line API mode).
+
+The C declarations below are compiled once into a real CPython extension
+that links against libflintdb, so `flintdb_cffi` does not have to parse
+them on import and every call is a direct, typed C call instead of a
+libffi trampoline.
+
+Usage:
+    python3 flintdb_build.py        # writes _flintdb.*.so next to this file
+
+Assumes libflintdb is built and located in ../../lib and the headers are in ../../src
+(same layout as the C tutorial Makefile).
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+
+from cffi import FFI
+
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.normpath(os.path.join(HERE, "..", "..", "src"))
+LIB_DIR = os.path.normpath(os.path.join(HERE, "..", "..", "lib"))
+
+
+CDEF = r"""
+    typedef int... i8;
+    typedef int... u8;
+    typedef int... i16;
+    typedef int... u16;
+    typedef int... i32;
+    typedef int... u32;
+    typedef int... i64;
+    typedef double f64;
+    typedef int... time_t;
+
+    struct flintdb_meta;
+    struct flintdb_transaction;
+
+    struct flintdb_cursor_i64 {
+        void *p;
+        i64 (*next)(struct flintdb_cursor_i64 *c, char **e);
+        void (*close)(struct flintdb_cursor_i64 *c);
+    };
+
+    struct flintdb_cursor_row;
+
+    enum flintdb_variant_type {
+        VARIANT_NULL = 0,
+        VARIANT_ZERO = 1,
+        VARIANT_INT32 = 2,
+        VARIANT_UINT32 = 3,
+        VARIANT_INT8 = 4,
+        VARIANT_UINT8 = 5,
+        VARIANT_INT16 = 6,
+        VARIANT_UINT16 = 7,
+        VARIANT_INT64 = 8,
+        VARIANT_DOUBLE = 9,
+        VARIANT_FLOAT = 10,
+        VARIANT_STRING = 11,
+        VARIANT_DECIMAL = 12,
+        VARIANT_BYTES = 13,
+        VARIANT_DATE = 14,
+        VARIANT_TIME = 15,
+        VARIANT_UUID = 16,
+        VARIANT_IPV6 = 17,
+        VARIANT_BLOB = 18,
+        VARIANT_OBJECT = 31
+    };
+
+    enum flintdb_variant_sflag {
+        VARIANT_SFLAG_NULL_TERMINATED = 0,
+        VARIANT_SFLAG_NOT_NULL_TERMINATED = 1
+    };
+
+    enum flintdb_null_spec {
+        SPEC_NULLABLE = 0,
+        SPEC_NOT_NULL = 1
+    };
+
+    struct flintdb_decimal {
+        u8 sign;
+        u8 scale;
+        u8 raw;
+        u8 reserved[1];
+        u32 length;
+        char data[16];
+    };
+
+    struct flintdb_variant {
+        enum flintdb_variant_type type;
+        union {
+            i64 i;
+            f64 f;
+            struct flintdb_decimal d;
+            struct {
+                u8 owned;
+                enum flintdb_variant_sflag sflag;
+                u8 reserved[2];
+                u32 length;
+                char *data;
+            } b;
+            time_t t;
+        } value;
+    };
+
+    struct flintdb_row {
+        struct flintdb_variant *array;
+        int length;
+        void *priv;
+
+        struct flintdb_meta *meta;
+        i64 rowid;
+        int refcount;
+
+        void (*free)(struct flintdb_row *r);
+        struct flintdb_row * (*retain)(struct flintdb_row *r);
+
+        i64 (*id)(const struct flintdb_row *r);
+        struct flintdb_variant * (*get)(const struct flintdb_row *r, u16 i, char **e);
+        void (*set)(struct flintdb_row *r, u16 i, struct flintdb_variant *v, char **e);
+        i8 (*is_nil)(const struct flintdb_row *r, u16 i, char **e);
+
+        void (*string_set)(struct flintdb_row *r, u16 i, const char *str, char **e);
+        void (*i64_set)(struct flintdb_row *r, u16 i, i64 val, char **e);
+        void (*f64_set)(struct flintdb_row *r, u16 i, f64 val, char **e);
+        void (*u8_set)(struct flintdb_row *r, u16 i, u8 val, char **e);
+        void (*i8_set)(struct flintdb_row *r, u16 i, i8 val, char **e);
+        void (*u16_set)(struct flintdb_row *r, u16 i, u16 val, char **e);
+        void (*i16_set)(struct flintdb_row *r, u16 i, i16 val, char **e);
+        void (*u32_set)(struct flintdb_row *r, u16 i, u32 val, char **e);
+        void (*i32_set)(struct flintdb_row *r, u16 i, i32 val, char **e);
+        void (*bytes_set)(struct flintdb_row *r, u16 i, const char *data, u32 length, char **e);
+        void (*date_set)(struct flintdb_row *r, u16 i, time_t val, char **e);
+        void (*time_set)(struct flintdb_row *r, u16 i, time_t val, char **e);
+        void (*uuid_set)(struct flintdb_row *r, u16 i, const char *data, u32 length, char **e);
+        void (*ipv6_set)(struct flintdb_row *r, u16 i, const char *data, u32 length, char **e);
+        void (*decimal_set)(struct flintdb_row *r, u16 i, struct flintdb_decimal data, char **e);
+
+        const char * (*string_get)(const struct flintdb_row *r, u16 i, char **e);
+        i8 (*i8_get)(const struct flintdb_row *r, u16 i, char **e);
+        u8 (*u8_get)(const struct flintdb_row *r, u16 i, char **e);
+        i16 (*i16_get)(const struct flintdb_row *r, u16 i, char **e);
+        u16 (*u16_get)(const struct flintdb_row *r, u16 i, char **e);
+        i32 (*i32_get)(const struct flintdb_row *r, u16 i, char **e);
+        u32 (*u32_get)(const struct flintdb_row *r, u16 i, char **e);
+        i64 (*i64_get)(const struct flintdb_row *r, u16 i, char **e);
+        f64 (*f64_get)(const struct flintdb_row *r, u16 i, char **e);
+        struct flintdb_decimal (*decimal_get)(const struct flintdb_row *r, u16 i, char **e);
+        const char * (*bytes_get)(const struct flintdb_row *r, u16 i, u32 *length, char **e);
+        time_t (*date_get)(const struct flintdb_row *r, u16 i, char **e);
+        time_t (*time_get)(const struct flintdb_row *r, u16 i, char **e);
+        const char * (*uuid_get)(const struct flintdb_row *r, u16 i, u32 *length, char **e);
+        const char * (*ipv6_get)(const struct flintdb_row *r, u16 i, u32 *length, char **e);
+
+        i8 (*is_zero)(const struct flintdb_row *r, u16 i, char **e);
+        i8 (*equals)(const struct flintdb_row *r, const struct flintdb_row *o);
+        i8 (*compare)(const struct flintdb_row *r, const struct flintdb_row *o, int (*cmp)(const struct flintdb_row*, const struct flintdb_row*));
+        struct flintdb_row * (*copy)(const struct flintdb_row *r, char **e);
+
+        i8 (*validate)(const struct flintdb_row *r, char **e);
+    };
+
+    struct flintdb_cursor_row {
+        void *p;
+        struct flintdb_row * (*next)(struct flintdb_cursor_row *c, char **e);
+        void (*close)(struct flintdb_cursor_row *c);
+    };
+
+    struct flintdb_table {
+        i64 (*rows)(const struct flintdb_table *me, char **e);
+        i64 (*bytes)(const struct flintdb_table *me, char **e);
+        const struct flintdb_meta * (*meta)(const struct flintdb_table *me, char **e);
+
+        i64 (*apply)(struct flintdb_table *me, struct flintdb_row *r, i8 upsert, char **e);
+        i64 (*apply_at)(struct flintdb_table *me, i64 rowid, struct flintdb_row *r, char **e);
+        i64 (*delete_at)(struct flintdb_table *me, i64 rowid, char **e);
+        struct flintdb_cursor_i64 * (*find)(const struct flintdb_table *me, const char *where, char **e);
+        const struct flintdb_row * (*one)(const struct flintdb_table *me, i8 index, u16 argc, const char **argv, char **e);
+        const struct flintdb_row * (*read)(struct flintdb_table *me, i64 rowid, char **e);
+        int (*read_stream)(struct flintdb_table *me, i64 rowid, struct flintdb_row *dest, char **e);
+        void (*close)(struct flintdb_table *me);
+        void *priv;
+    };
+
+    struct flintdb_genericfile {
+        i64 (*rows)(const struct flintdb_genericfile *me, char **e);
+        i64 (*bytes)(const struct flintdb_genericfile *me, char **e);
+        const struct flintdb_meta * (*meta)(const struct flintdb_genericfile *me, char **e);
+
+        i64 (*write)(struct flintdb_genericfile *me, struct flintdb_row *r, char **e);
+        struct flintdb_cursor_row * (*find)(const struct flintdb_genericfile *me, const char *where, char **e);
+        void (*close)(struct flintdb_genericfile *me);
+        void *priv;
+    };
+
+    struct flintdb_filesort {
+        void (*close)(struct flintdb_filesort *me);
+        i64 (*rows)(const struct flintdb_filesort *me);
+        i64 (*add)(struct flintdb_filesort *me, struct flintdb_row *r, char **e);
+        struct flintdb_row * (*read)(const struct flintdb_filesort *me, i64 i, char **e);
+        i64 (*sort)(struct flintdb_filesort *me,
+                    int (*cmpr)(const void *obj, const struct flintdb_row *a, const struct flintdb_row *b),
+                    const void *ctx,
+                    char **e);
+        void *priv;
+    };
+
+    struct flintdb_aggregate_groupkey;
+
+    struct flintdb_aggregate {
+        void *priv;
+        void (*free)(struct flintdb_aggregate *agg);
+        void (*row)(struct flintdb_aggregate *agg, const struct flintdb_row *r, char **e);
+        int (*compute)(struct flintdb_aggregate *agg, struct flintdb_row ***out_rows, char **e);
+    };
+
+    struct flintdb_aggregate_groupby {
+        void *priv;
+        void (*free)(struct flintdb_aggregate_groupby *gb);
+        const char * (*alias)(const struct flintdb_aggregate_groupby *gb);
+        const char * (*column)(const struct flintdb_aggregate_groupby *gb);
+        enum flintdb_variant_type (*type)(const struct flintdb_aggregate_groupby *gb);
+        struct flintdb_variant * (*get)(const struct flintdb_aggregate_groupby *gb, const struct flintdb_row *r, char **e);
+    };
+
+    struct flintdb_aggregate_condition {
+        i8 (*ok)(const struct flintdb_aggregate_condition *cond, const struct flintdb_row *r, char **e);
+    };
+
+    struct flintdb_aggregate_func {
+        void *priv;
+        void (*free)(struct flintdb_aggregate_func *f);
+        const char * (*name)(const struct flintdb_aggregate_func *f);
+        const char * (*alias)(const struct flintdb_aggregate_func *f);
+        enum flintdb_variant_type (*type)(const struct flintdb_aggregate_func *f);
+        int (*precision)(const struct flintdb_aggregate_func *f);
+        const struct flintdb_aggregate_condition * (*condition)(const struct flintdb_aggregate_func *f);
+        void (*row)(struct flintdb_aggregate_func *f, const struct flintdb_aggregate_groupkey *gk, const struct flintdb_row *r, char **e);
+        void (*compute)(struct flintdb_aggregate_func *f, const struct flintdb_aggregate_groupkey *gk, char **e);
+        const struct flintdb_variant * (*result)(const struct flintdb_aggregate_func *f, const struct flintdb_aggregate_groupkey *gk, char **e);
+    };
+
+    struct flintdb_sql_result {
+        i64 affected;
+        char **column_names;
+        int column_count;
+        struct flintdb_cursor_row *row_cursor;
+        struct flintdb_transaction *transaction;
+        void (*close)(struct flintdb_sql_result *me);
+    };
+
+    // API functions
+    struct flintdb_meta* flintdb_meta_new_ptr(const char *name, char **e);
+    struct flintdb_meta* flintdb_meta_open_ptr(const char *filename, char **e);
+    void flintdb_meta_free_ptr(struct flintdb_meta *m);
+
+    int flintdb_meta_to_sql_string(const struct flintdb_meta *m, char *s, i32 len, char **e);
+    void flintdb_meta_columns_add(struct flintdb_meta *m, const char *name, enum flintdb_variant_type type,
+                                 i32 bytes, i16 precision, enum flintdb_null_spec nullspec,
+                                 const char *value, const char *comment, char **e);
+    void flintdb_meta_indexes_add(struct flintdb_meta *m, const char *name, const char *algorithm,
+                                 const char keys[][40], u16 key_count, char **e);
+    int flintdb_column_at(struct flintdb_meta *m, const char *name);
+
+    struct flintdb_row * flintdb_row_new(struct flintdb_meta *meta, char **e);
+    void flintdb_print_row(const struct flintdb_row *r);
+
+    struct flintdb_table * flintdb_table_open(const char *file, int mode, const struct flintdb_meta *meta, char **e);
+    int flintdb_table_drop(const char *file, char **e);
+
+    struct flintdb_genericfile * flintdb_genericfile_open(const char *file, int mode, const struct flintdb_meta *meta, char **e);
+    void flintdb_genericfile_drop(const char *file, char **e);
+
+    struct flintdb_filesort * flintdb_filesort_new(const char *file, const struct flintdb_meta *m, char **e);
+
+    struct flintdb_aggregate* aggregate_new(const char *id, struct flintdb_aggregate_groupby **groupby, u16 groupby_count,
+                                           struct flintdb_aggregate_func **funcs, u16 func_count, char **e);
+    struct flintdb_aggregate_groupby* groupby_new(const char *alias, const char *column, enum flintdb_variant_type type, char **e);
+
+    struct flintdb_aggregate_func * flintdb_func_count(const char *name, const char *alias, enum flintdb_variant_type type,
+                                                      struct flintdb_aggregate_condition cond, char **e);
+    struct flintdb_aggregate_func * flintdb_func_sum(const char *name, const char *alias, enum flintdb_variant_type type,
+                                                    struct flintdb_aggregate_condition cond, char **e);
+    struct flintdb_aggregate_func * flintdb_func_avg(const char *name, const char *alias, enum flintdb_variant_type type,
+                                                    struct flintdb_aggregate_condition cond, char **e);
+
+    struct flintdb_sql_result* flintdb_sql_exec(const char *sql, const struct flintdb_transaction *transaction, char **e);
+
+    void flintdb_cleanup(char **e);
+
+    // FileSort comparator implemented in Python (@ffi.def_extern in flintdb_cffi)
+    extern "Python" int flintdb_py_row_cmp(const void *ctx, const struct flintdb_row *a, const struct flintdb_row *b);
+
+    // Helpers compiled into the extension (see SOURCE below)
+    struct flintdb_py_column_def {
+        const char *name;
+        int type;
+        int size;
+        int precision;
+        int spec;
+        const char *value;
+        const char *comment;
+    };
+    struct flintdb_py_index_def {
+        const char *name;
+        const char *algorithm;
+        const char *keys; // key_count names, 40 bytes each, NUL-padded
+        int key_count;
+    };
+    int flintdb_py_meta_build(struct flintdb_meta *m, const struct flintdb_py_column_def *cols, int ncols,
+                              const struct flintdb_py_index_def *indexes, int nindexes, char **e);
+    i64 flintdb_py_table_apply_many(struct flintdb_table *t, struct flintdb_row **rows, size_t n, i8 upsert,
+                                    i64 *out_rowids, char **e);
+    i64 flintdb_py_table_apply_columns(struct flintdb_table *t, struct flintdb_row *r, i64 n, const void **cols,
+                                       const char *kinds, const int *widths, int k, i8 upsert, char **e);
+    i64 flintdb_py_filesort_add_columns(struct flintdb_filesort *fs, struct flintdb_row *r, i64 n,
+                                        const void **cols, const char *kinds, const int *widths, int k,
+                                        char **e);
+    int flintdb_py_cursor_i64_fetch(struct flintdb_cursor_i64 *c, i64 *out, int cap, char **e);
+    int flintdb_py_meta_column_types(const struct flintdb_meta *m, char *out, int cap);
+    const char *flintdb_py_meta_column_name(const struct flintdb_meta *m, int i);
+    int flintdb_py_meta_required_columns(const struct flintdb_meta *m, int *out, int cap);
+    int flintdb_py_rows_to_f64(struct flintdb_row **rows, int n, const int *cols, int k, f64 *out, char **e);
+    void flintdb_py_rows_free(struct flintdb_row **rows, int n);
+    void flintdb_py_row_reset(struct flintdb_row *r, char **e);
+    void flintdb_py_print_rows(struct flintdb_row **rows, int n);
+    i64 flintdb_py_table_find_first(struct flintdb_table *t, const char *where, char **e);
+    i64 flintdb_py_table_print(struct flintdb_table *t, const i64 *ids, i64 nids, struct flintdb_cursor_i64 *c,
+                               char **e);
+    i64 flintdb_py_aggregate_ingest(struct flintdb_aggregate *agg, struct flintdb_table *t, const i64 *ids, i64 nids,
+                                    struct flintdb_cursor_i64 *c, char **e);
+    i64 flintdb_py_aggregate_ingest_rows(struct flintdb_aggregate *agg, struct flintdb_cursor_row *c, char **e);
+    int flintdb_py_filesort_keys(struct flintdb_filesort *fs, int col, i8 as_f64, void *out, i64 n, char **e);
+    int flintdb_py_cmp_i64(const void *ctx, const struct flintdb_row *a, const struct flintdb_row *b);
+    int flintdb_py_cmp_f64(const void *ctx, const struct flintdb_row *a, const struct flintdb_row *b);
+
+    // libc malloc/free for ownership-transfer cases (e.g., aggregate_new consumes arrays)
+    void *malloc(size_t size);
+    void free(void *ptr);
+"""
+
+
+SOURCE = r"""
+#include <math.h>
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include "flintdb.h"
+
+struct flintdb_py_column_def {
+    const char *name;
+    int type;
+    int size;
+    int precision;
+    int spec;
+    const char *value;
+    const char *comment;
+};
+
+struct flintdb_py_index_def {
+    const char *name;
+    const char *algorithm;
+    const char *keys;
+    int key_count;
+};
+
+// Add every column, then every index, to m (Meta.from_schema). Returns 0, or
+// -1 with *e set by the first add that fails.
+static int flintdb_py_meta_build(struct flintdb_meta *m, const struct flintdb_py_column_def *cols, int ncols,
+                                 const struct flintdb_py_index_def *indexes, int nindexes, char **e) {
+    for (int i = 0; i < ncols; i++) {
+        const struct flintdb_py_column_def *c = &cols[i];
+        flintdb_meta_columns_add(m, c->name, (enum flintdb_variant_type)c->type, c->size, (i16)c->precision,
+                                 (enum flintdb_null_spec)c->spec, c->value, c->comment, e);
+        if (e && *e) return -1;
+    }
+    for (int i = 0; i < nindexes; i++) {
+        const struct flintdb_py_index_def *x = &indexes[i];
+        flintdb_meta_indexes_add(m, x->name, x->algorithm, (const char (*)[MAX_COLUMN_NAME_LIMIT])x->keys,
+                                 (u16)x->key_count, e);
+        if (e && *e) return -1;
+    }
+    return 0;
+}
+
+// Apply n rows in one call. Returns the number of rows applied; stops at the
+// first error (*e set) or negative rowid.
+static i64 flintdb_py_table_apply_many(struct flintdb_table *t, struct flintdb_row **rows, size_t n, i8 upsert,
+                                       i64 *out_rowids, char **e) {
+    size_t i;
+    for (i = 0; i < n; i++) {
+        i64 rowid = t->apply(t, rows[i], upsert, e);
+        if ((e && *e) || rowid < 0) break;
+        if (out_rowids) out_rowids[i] = rowid;
+    }
+    return (i64)i;
+}
+
+// Pull up to cap rowids from a cursor into out. Returns how many were written;
+// fewer than cap means the cursor is exhausted (or *e is set).
+static int flintdb_py_cursor_i64_fetch(struct flintdb_cursor_i64 *c, i64 *out, int cap, char **e) {
+    if (!c) {
+        if (e) *e = "cursor is closed";
+        return 0;
+    }
+    int n = 0;
+    while (n < cap) {
+        i64 v = c->next(c, e);
+        if ((e && *e) || v < 0) break;
+        out[n++] = v;
+    }
+    return n;
+}
+
+// Column-wise input (Table.apply_columns, FileSort.add_columns): cols[j] points
+// to n values of kind kinds[j]: 'i' i32, 'q' i64, 'd' f64, or 's' NUL-padded
+// strings of widths[j] bytes each.
+
+// Scratch buffer for the widest string column plus its NUL; NULL (without an
+// error) when there are no string columns.
+static char *flintdb_py_columns_tmp(const char *kinds, const int *widths, int k, char **e) {
+    int maxw = 0;
+    for (int j = 0; j < k; j++)
+        if (kinds[j] == 's' && widths[j] > maxw) maxw = widths[j];
+    if (!maxw) return NULL;
+    char *tmp = (char *)malloc((size_t)maxw + 1);
+    if (!tmp && e) *e = "columns: out of memory";
+    return tmp;
+}
+
+// Write record i of the columns into r. Stops at the first error (*e set).
+static void flintdb_py_row_fill(struct flintdb_row *r, i64 i, const void **cols, const char *kinds,
+                                const int *widths, int k, char *tmp, char **e) {
+    for (int j = 0; j < k; j++) {
+        const char *col = (const char *)cols[j];
+        switch (kinds[j]) {
+        case 'i': r->i32_set(r, (u16)j, ((const i32 *)col)[i], e); break;
+        case 'q': r->i64_set(r, (u16)j, ((const i64 *)col)[i], e); break;
+        case 'd': r->f64_set(r, (u16)j, ((const f64 *)col)[i], e); break;
+        case 's': {
+            const char *s = col + (size_t)i * widths[j];
+            size_t len = strnlen(s, (size_t)widths[j]);
+            memcpy(tmp, s, len);
+            tmp[len] = '\0';
+            r->string_set(r, (u16)j, tmp, e);
+            break;
+        }
+        default:
+            if (e) *e = "columns: unknown column kind";
+        }
+        if (e && *e) return;
+    }
+}
+
+// Apply n rows given column-wise. Every record is written into the one row r
+// (its rowid reset so apply inserts). Returns the number of rows applied;
+// stops at the first error (*e set).
+static i64 flintdb_py_table_apply_columns(struct flintdb_table *t, struct flintdb_row *r, i64 n, const void **cols,
+                                          const char *kinds, const int *widths, int k, i8 upsert, char **e) {
+    char *tmp = flintdb_py_columns_tmp(kinds, widths, k, e);
+    if (e && *e) return 0;
+
+    i64 i;
+    for (i = 0; i < n; i++) {
+        flintdb_py_row_fill(r, i, cols, kinds, widths, k, tmp, e);
+        if (e && *e) break;
+        r->rowid = -1;
+        i64 rowid = t->apply(t, r, upsert, e);
+        if ((e && *e) || rowid < 0) break;
+    }
+
+    free(tmp);
+    return i;
+}
+
+// Add n rows given column-wise to fs, each written into the one row r first.
+// Returns the number of rows added; stops at the first error (*e set).
+static i64 flintdb_py_filesort_add_columns(struct flintdb_filesort *fs, struct flintdb_row *r, i64 n,
+                                           const void **cols, const char *kinds, const int *widths, int k,
+                                           char **e) {
+    char *tmp = flintdb_py_columns_tmp(kinds, widths, k, e);
+    if (e && *e) return 0;
+
+    i64 i;
+    for (i = 0; i < n; i++) {
+        flintdb_py_row_fill(r, i, cols, kinds, widths, k, tmp, e);
+        if (e && *e) break;
+        if (fs->add(fs, r, e) < 0 || (e && *e)) break;
+    }
+
+    free(tmp);
+    return i;
+}
+
+// Copy the column types of a schema into out (one byte per column); this is
+// the fingerprint the Python side uses to pick per-column setters.
+static int flintdb_py_meta_column_types(const struct flintdb_meta *m, char *out, int cap) {
+    if (!m) return -1;
+    int n = m->columns.length < cap ? m->columns.length : cap;
+    for (int i = 0; i < n; i++) out[i] = (char)m->columns.a[i].type;
+    return n;
+}
+
+// Name of column i, or NULL if out of range.
+static const char *flintdb_py_meta_column_name(const struct flintdb_meta *m, int i) {
+    if (!m || i < 0 || i >= m->columns.length) return NULL;
+    return m->columns.a[i].name;
+}
+
+// Indices of the NOT NULL columns that have no default, i.e. the only columns
+// row->validate can reject on a row that started from its schema defaults.
+static int flintdb_py_meta_required_columns(const struct flintdb_meta *m, int *out, int cap) {
+    if (!m) return -1;
+    int n = 0;
+    for (int i = 0; i < m->columns.length && n < cap; i++) {
+        const struct flintdb_column *col = &m->columns.a[i];
+        if (col->nullspec == SPEC_NOT_NULL && col->value[0] == '\0') out[n++] = i;
+    }
+    return n;
+}
+
+// Copy columns cols[0..k) of n rows into a row-major n x k f64 matrix.
+// DECIMAL values are converted and NULLs become NaN. Returns n, or -1 with *e set.
+static int flintdb_py_rows_to_f64(struct flintdb_row **rows, int n, const int *cols, int k, f64 *out, char **e) {
+    for (int i = 0; i < n; i++) {
+        struct flintdb_row *r = rows[i];
+        for (int j = 0; j < k; j++) {
+            int c = cols[j];
+            if (!r || c < 0 || c >= r->length) {
+                *e = "rows_to_f64: row is NULL or column out of bounds";
+                return -1;
+            }
+            const struct flintdb_variant *v = &r->array[c];
+            f64 x;
+            if (v->type == VARIANT_NULL) {
+                x = NAN;
+            } else if (v->type == VARIANT_DECIMAL) {
+                struct flintdb_decimal d = r->decimal_get(r, (u16)c, e);
+                x = *e ? 0.0 : flintdb_decimal_to_f64(&d, e);
+            } else {
+                x = r->f64_get(r, (u16)c, e);
+            }
+            if (*e) return -1;
+            out[(size_t)i * k + j] = x;
+        }
+    }
+    return n;
+}
+
+// Free the rows and the row array returned by aggregate->compute().
+static void flintdb_py_rows_free(struct flintdb_row **rows, int n) {
+    if (!rows) return;
+    for (int i = 0; i < n; i++) {
+        if (rows[i]) rows[i]->free(rows[i]);
+    }
+    free(rows);
+}
+
+// Reset a row for reuse: every column back to its schema default (or NULL) and
+// the rowid cleared, as flintdb_row_new leaves it.
+static void flintdb_py_row_reset(struct flintdb_row *r, char **e) {
+    const struct flintdb_meta *m = r->meta;
+    r->rowid = -1;
+    for (int i = 0; i < r->length; i++) {
+        flintdb_variant_free(&r->array[i]);
+        flintdb_variant_init(&r->array[i]);
+        const char *defv = m ? m->columns.a[i].value : NULL;
+        if (defv && defv[0] != '\0') {
+            struct flintdb_variant tmp;
+            flintdb_variant_init(&tmp);
+            flintdb_variant_string_ref_set(&tmp, defv, (u32)strlen(defv), VARIANT_SFLAG_NULL_TERMINATED);
+            r->set(r, (u16)i, &tmp, e);
+            flintdb_variant_free(&tmp);
+            if (e && *e) return;
+        }
+    }
+}
+
+// Print n rows as flintdb_print_row does, flushing stdout once at the end.
+static void flintdb_py_print_rows(struct flintdb_row **rows, int n) {
+    for (int i = 0; i < n; i++) flintdb_print_row(rows[i]);
+    fflush(stdout);
+}
+
+// Rowid of the first row matching where, or -1 if there is none (an empty
+// result may come back as a NULL cursor). Opens and closes its own cursor.
+static i64 flintdb_py_table_find_first(struct flintdb_table *t, const char *where, char **e) {
+    struct flintdb_cursor_i64 *c = t->find(t, where, e);
+    if (e && *e) return -1;
+    if (!c) return -1;
+    i64 rowid = c->next(c, e);
+    c->close(c);
+    return rowid < 0 ? -1 : rowid;
+}
+
+// Next rowid for the helpers below: first the nids rowids in ids (read ahead
+// by the Python cursor), then whatever c yields (c may be NULL). -1 when done.
+static i64 flintdb_py_next_rowid(const i64 *ids, i64 nids, i64 *k, struct flintdb_cursor_i64 *c, char **e) {
+    if (*k < nids) return ids[(*k)++];
+    return c ? c->next(c, e) : -1;
+}
+
+// Print each row of t for ids, then for the rest of c, flushing stdout once at
+// the end. Returns the number of rows printed, or -1 with *e set.
+static i64 flintdb_py_table_print(struct flintdb_table *t, const i64 *ids, i64 nids, struct flintdb_cursor_i64 *c,
+                                  char **e) {
+    i64 n = 0, k = 0;
+    for (;;) {
+        i64 rowid = flintdb_py_next_rowid(ids, nids, &k, c, e);
+        if (e && *e) { n = -1; break; }
+        if (rowid < 0) break;
+        const struct flintdb_row *r = t->read(t, rowid, e);
+        if (e && *e) { n = -1; break; }
+        flintdb_print_row(r);
+        n++;
+    }
+    fflush(stdout);
+    return n;
+}
+
+// Feed each row of t for ids, then for the rest of c, to agg.
+// Returns the number of rows aggregated, or -1 with *e set.
+static i64 flintdb_py_aggregate_ingest(struct flintdb_aggregate *agg, struct flintdb_table *t, const i64 *ids, i64 nids,
+                                       struct flintdb_cursor_i64 *c, char **e) {
+    i64 n = 0, k = 0;
+    for (;;) {
+        i64 rowid = flintdb_py_next_rowid(ids, nids, &k, c, e);
+        if (e && *e) return -1;
+        if (rowid < 0) break;
+        const struct flintdb_row *r = t->read(t, rowid, e);
+        if (e && *e) return -1;
+        agg->row(agg, r, e);
+        if (e && *e) return -1;
+        n++;
+    }
+    return n;
+}
+
+// Same as flintdb_py_aggregate_ingest for a row cursor (genericfile / SQL results).
+static i64 flintdb_py_aggregate_ingest_rows(struct flintdb_aggregate *agg, struct flintdb_cursor_row *c, char **e) {
+    if (!c) {
+        if (e) *e = "cursor is closed";
+        return -1;
+    }
+    i64 n = 0;
+    for (;;) {
+        struct flintdb_row *r = c->next(c, e);
+        if (e && *e) return -1;
+        if (!r) break;
+        agg->row(agg, r, e);
+        if (e && *e) return -1;
+        n++;
+    }
+    return n;
+}
+
+// Read column col of the first n rows of fs into out (i64[n], or f64[n] when
+// as_f64). Returns 0, or -1 with *e set.
+static int flintdb_py_filesort_keys(struct flintdb_filesort *fs, int col, i8 as_f64, void *out, i64 n, char **e) {
+    for (i64 i = 0; i < n; i++) {
+        struct flintdb_row *r = fs->read(fs, i, e);
+        if (e && *e) return -1;
+        if (!r) {
+            *e = "filesort_keys: read returned NULL";
+            return -1;
+        }
+        if (as_f64) ((f64 *)out)[i] = r->f64_get(r, (u16)col, e);
+        else ((i64 *)out)[i] = r->i64_get(r, (u16)col, e);
+        r->free(r);
+        if (e && *e) return -1;
+    }
+    return 0;
+}
+
+// FileSort comparators used by FileSort.sort_by(). ctx points to two ints:
+// the column index and the direction (1 ascending, -1 descending).
+static int flintdb_py_cmp_i64(const void *ctx, const struct flintdb_row *a, const struct flintdb_row *b) {
+    const int *c = (const int *)ctx;
+    i64 x = a->i64_get(a, (u16)c[0], NULL);
+    i64 y = b->i64_get(b, (u16)c[0], NULL);
+    return ((x > y) - (x < y)) * c[1];
+}
+
+static int flintdb_py_cmp_f64(const void *ctx, const struct flintdb_row *a, const struct flintdb_row *b) {
+    const int *c = (const int *)ctx;
+    f64 x = a->f64_get(a, (u16)c[0], NULL);
+    f64 y = b->f64_get(b, (u16)c[0], NULL);
+    return ((x > y) - (x < y)) * c[1];
+}
+"""
+
+
+def _rpath_args():
+    if sys.platform == "darwin":
+        return ["-Wl,-rpath,@loader_path/../../lib"]
+    if sys.platform.startswith("linux"):
+        return ["-Wl,-rpath,$ORIGIN/../../lib"]
+    return []
+
+
+ffibuilder = FFI()
+ffibuilder.cdef(CDEF)
+ffibuilder.set_source(
+    "_flintdb",
+    SOURCE,
+    include_dirs=[SRC_DIR],
+    library_dirs=[LIB_DIR],
+    libraries=["flintdb"],
+    extra_link_args=_rpath_args(),
+)
+
+
+if __name__ == "__main__":
+    ffibuilder.compile(tmpdir=HERE, verbose=True)
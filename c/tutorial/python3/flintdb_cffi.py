@@ -5,313 +5,47 @@ This module intentionally models only the API surface used by `tutorial.py`.
 It uses opaque pointers where possible, and accesses vtable-style function
 pointers via struct definitions where necessary (Row/Table/FileSort/etc.).
 
+The C declarations live in `flintdb_build.py`, which compiles them into the
+`_flintdb` extension (cffi out-of-line API mode). Build it once before use:
+    python3 flintdb_build.py
+
 Notes on ownership:
 - Rows returned by Table.read() and CursorRow.next() are BORROWED.
 - Rows returned by FileSort.read() and Aggregate.compute() are OWNED and must be freed.
+- Owned handles are also released when their wrapper is garbage-collected (or at
+  interpreter exit); close()/`with` just does it earlier.
 """
 
 from __future__ import annotations
 
+import array
+import functools
+import keyword
+import math
 import os
+import re
+import sys
+import threading
+import weakref
+from collections import deque
 from dataclasses import dataclass
-from typing import Callable, Iterable, List, Optional, Sequence, Union
-
-from cffi import FFI
-
-
-ffi = FFI()
-
-ffi.cdef(
-    r"""
-    typedef signed char i8;
-    typedef unsigned char u8;
-    typedef short i16;
-    typedef unsigned short u16;
-    typedef int i32;
-    typedef unsigned int u32;
-    typedef long long i64;
-    typedef double f64;
-    typedef unsigned long size_t;
-    typedef long time_t;
-
-    struct flintdb_meta;
-
-    struct flintdb_cursor_i64 {
-        void *p;
-        i64 (*next)(struct flintdb_cursor_i64 *c, char **e);
-        void (*close)(struct flintdb_cursor_i64 *c);
-    };
-
-    struct flintdb_cursor_row;
-
-    enum flintdb_variant_type {
-        VARIANT_NULL = 0,
-        VARIANT_ZERO = 1,
-        VARIANT_INT32 = 2,
-        VARIANT_UINT32 = 3,
-        VARIANT_INT8 = 4,
-        VARIANT_UINT8 = 5,
-        VARIANT_INT16 = 6,
-        VARIANT_UINT16 = 7,
-        VARIANT_INT64 = 8,
-        VARIANT_DOUBLE = 9,
-        VARIANT_FLOAT = 10,
-        VARIANT_STRING = 11,
-        VARIANT_DECIMAL = 12,
-        VARIANT_BYTES = 13,
-        VARIANT_DATE = 14,
-        VARIANT_TIME = 15,
-        VARIANT_UUID = 16,
-        VARIANT_IPV6 = 17,
-        VARIANT_BLOB = 18,
-        VARIANT_OBJECT = 31
-    };
-
-    enum flintdb_null_spec {
-        SPEC_NULLABLE = 0,
-        SPEC_NOT_NULL = 1
-    };
-
-    struct flintdb_decimal {
-        u8 sign;
-        u8 scale;
-        u8 reserved[2];
-        u32 length;
-        char data[16];
-    };
-
-    struct flintdb_variant {
-        enum flintdb_variant_type type;
-        union {
-            i64 i;
-            f64 f;
-            struct flintdb_decimal d;
-            struct {
-                u8 owned;
-                u8 sflag;
-                u8 reserved[2];
-                u32 length;
-                char *data;
-            } b;
-            time_t t;
-        } value;
-    };
-
-    struct flintdb_row {
-        struct flintdb_variant *array;
-        int length;
-        void *priv;
-
-        struct flintdb_meta *meta;
-        i64 rowid;
-        int refcount;
-
-        void (*free)(struct flintdb_row *r);
-        struct flintdb_row * (*retain)(struct flintdb_row *r);
-
-        i64 (*id)(const struct flintdb_row *r);
-        struct flintdb_variant * (*get)(const struct flintdb_row *r, u16 i, char **e);
-        void (*set)(struct flintdb_row *r, u16 i, struct flintdb_variant *v, char **e);
-        i8 (*is_nil)(const struct flintdb_row *r, u16 i, char **e);
-
-        void (*string_set)(struct flintdb_row *r, u16 i, const char *str, char **e);
-        void (*i64_set)(struct flintdb_row *r, u16 i, i64 val, char **e);
-        void (*f64_set)(struct flintdb_row *r, u16 i, f64 val, char **e);
-        void (*u8_set)(struct flintdb_row *r, u16 i, u8 val, char **e);
-        void (*i8_set)(struct flintdb_row *r, u16 i, i8 val, char **e);
-        void (*u16_set)(struct flintdb_row *r, u16 i, u16 val, char **e);
-        void (*i16_set)(struct flintdb_row *r, u16 i, i16 val, char **e);
-        void (*u32_set)(struct flintdb_row *r, u16 i, u32 val, char **e);
-        void (*i32_set)(struct flintdb_row *r, u16 i, i32 val, char **e);
-        void (*bytes_set)(struct flintdb_row *r, u16 i, const char *data, u32 length, char **e);
-        void (*date_set)(struct flintdb_row *r, u16 i, time_t val, char **e);
-        void (*time_set)(struct flintdb_row *r, u16 i, time_t val, char **e);
-        void (*uuid_set)(struct flintdb_row *r, u16 i, const char *data, u32 length, char **e);
-        void (*ipv6_set)(struct flintdb_row *r, u16 i, const char *data, u32 length, char **e);
-        void (*decimal_set)(struct flintdb_row *r, u16 i, struct flintdb_decimal data, char **e);
-
-        const char * (*string_get)(const struct flintdb_row *r, u16 i, char **e);
-        i8 (*i8_get)(const struct flintdb_row *r, u16 i, char **e);
-        u8 (*u8_get)(const struct flintdb_row *r, u16 i, char **e);
-        i16 (*i16_get)(const struct flintdb_row *r, u16 i, char **e);
-        u16 (*u16_get)(const struct flintdb_row *r, u16 i, char **e);
-        i32 (*i32_get)(const struct flintdb_row *r, u16 i, char **e);
-        u32 (*u32_get)(const struct flintdb_row *r, u16 i, char **e);
-        i64 (*i64_get)(const struct flintdb_row *r, u16 i, char **e);
-        f64 (*f64_get)(const struct flintdb_row *r, u16 i, char **e);
-        struct flintdb_decimal (*decimal_get)(const struct flintdb_row *r, u16 i, char **e);
-        const char * (*bytes_get)(const struct flintdb_row *r, u16 i, u32 *length, char **e);
-        time_t (*date_get)(const struct flintdb_row *r, u16 i, char **e);
-        time_t (*time_get)(const struct flintdb_row *r, u16 i, char **e);
-        const char * (*uuid_get)(const struct flintdb_row *r, u16 i, u32 *length, char **e);
-        const char * (*ipv6_get)(const struct flintdb_row *r, u16 i, u32 *length, char **e);
-
-        i8 (*is_zero)(const struct flintdb_row *r, u16 i, char **e);
-        i8 (*equals)(const struct flintdb_row *r, const struct flintdb_row *o);
-        i8 (*compare)(const struct flintdb_row *r, const struct flintdb_row *o, int (*cmp)(const struct flintdb_row*, const struct flintdb_row*));
-        struct flintdb_row * (*copy)(const struct flintdb_row *r, char **e);
-
-        i8 (*validate)(const struct flintdb_row *r, char **e);
-    };
-
-    struct flintdb_cursor_row {
-        void *p;
-        struct flintdb_row * (*next)(struct flintdb_cursor_row *c, char **e);
-        void (*close)(struct flintdb_cursor_row *c);
-    };
-
-    struct flintdb_table {
-        i64 (*rows)(const struct flintdb_table *me, char **e);
-        i64 (*bytes)(const struct flintdb_table *me, char **e);
-        const struct flintdb_meta * (*meta)(const struct flintdb_table *me, char **e);
-
-        i64 (*apply)(struct flintdb_table *me, struct flintdb_row *r, i8 upsert, char **e);
-        i64 (*apply_at)(struct flintdb_table *me, i64 rowid, struct flintdb_row *r, char **e);
-        i64 (*delete_at)(struct flintdb_table *me, i64 rowid, char **e);
-        struct flintdb_cursor_i64 * (*find)(const struct flintdb_table *me, const char *where, char **e);
-        const struct flintdb_row * (*one)(const struct flintdb_table *me, i8 index, u16 argc, const char **argv, char **e);
-        const struct flintdb_row * (*read)(struct flintdb_table *me, i64 rowid, char **e);
-        int (*read_stream)(struct flintdb_table *me, i64 rowid, struct flintdb_row *dest, char **e);
-        void (*close)(struct flintdb_table *me);
-        void *priv;
-    };
-
-    struct flintdb_genericfile {
-        i64 (*rows)(const struct flintdb_genericfile *me, char **e);
-        i64 (*bytes)(const struct flintdb_genericfile *me, char **e);
-        const struct flintdb_meta * (*meta)(const struct flintdb_genericfile *me, char **e);
-
-        i64 (*write)(struct flintdb_genericfile *me, struct flintdb_row *r, char **e);
-        struct flintdb_cursor_row * (*find)(const struct flintdb_genericfile *me, const char *where, char **e);
-        void (*close)(struct flintdb_genericfile *me);
-        void *priv;
-    };
-
-    struct flintdb_filesort {
-        void (*close)(struct flintdb_filesort *me);
-        i64 (*rows)(const struct flintdb_filesort *me);
-        i64 (*add)(struct flintdb_filesort *me, struct flintdb_row *r, char **e);
-        struct flintdb_row * (*read)(const struct flintdb_filesort *me, i64 i, char **e);
-        i64 (*sort)(struct flintdb_filesort *me,
-                    int (*cmpr)(const void *obj, const struct flintdb_row *a, const struct flintdb_row *b),
-                    const void *ctx,
-                    char **e);
-        void *priv;
-    };
-
-    struct flintdb_aggregate_groupkey;
-
-    struct flintdb_aggregate {
-        void *priv;
-        void (*free)(struct flintdb_aggregate *agg);
-        void (*row)(struct flintdb_aggregate *agg, const struct flintdb_row *r, char **e);
-        int (*compute)(struct flintdb_aggregate *agg, struct flintdb_row ***out_rows, char **e);
-    };
-
-    struct flintdb_aggregate_groupby {
-        void *priv;
-        void (*free)(struct flintdb_aggregate_groupby *gb);
-        const char * (*alias)(const struct flintdb_aggregate_groupby *gb);
-        const char * (*column)(const struct flintdb_aggregate_groupby *gb);
-        enum flintdb_variant_type (*type)(const struct flintdb_aggregate_groupby *gb);
-        struct flintdb_variant * (*get)(const struct flintdb_aggregate_groupby *gb, const struct flintdb_row *r, char **e);
-    };
-
-    struct flintdb_aggregate_condition {
-        i8 (*ok)(const struct flintdb_aggregate_condition *cond, const struct flintdb_row *r, char **e);
-    };
-
-    struct flintdb_aggregate_func {
-        void *priv;
-        void (*free)(struct flintdb_aggregate_func *f);
-        const char * (*name)(const struct flintdb_aggregate_func *f);
-        const char * (*alias)(const struct flintdb_aggregate_func *f);
-        enum flintdb_variant_type (*type)(const struct flintdb_aggregate_func *f);
-        int (*precision)(const struct flintdb_aggregate_func *f);
-        const struct flintdb_aggregate_condition * (*condition)(const struct flintdb_aggregate_func *f);
-        void (*row)(struct flintdb_aggregate_func *f, const struct flintdb_aggregate_groupkey *gk, const struct flintdb_row *r, char **e);
-        void (*compute)(struct flintdb_aggregate_func *f, const struct flintdb_aggregate_groupkey *gk, char **e);
-        const struct flintdb_variant * (*result)(const struct flintdb_aggregate_func *f, const struct flintdb_aggregate_groupkey *gk, char **e);
-    };
-
-    struct flintdb_sql_result {
-        i64 affected;
-        char **column_names;
-        int column_count;
-        struct flintdb_cursor_row *row_cursor;
-        void *transaction;
-        void (*close)(struct flintdb_sql_result *me);
-    };
-
-    // API functions
-    struct flintdb_meta* flintdb_meta_new_ptr(const char *name, char **e);
-    struct flintdb_meta* flintdb_meta_open_ptr(const char *filename, char **e);
-    void flintdb_meta_free_ptr(struct flintdb_meta *m);
-
-    int flintdb_meta_to_sql_string(const struct flintdb_meta *m, char *s, i32 len, char **e);
-    void flintdb_meta_columns_add(struct flintdb_meta *m, const char *name, enum flintdb_variant_type type,
-                                 i32 bytes, i16 precision, enum flintdb_null_spec nullspec,
-                                 const char *value, const char *comment, char **e);
-    void flintdb_meta_indexes_add(struct flintdb_meta *m, const char *name, const char *algorithm,
-                                 const char keys[][40], u16 key_count, char **e);
-    int flintdb_column_at(struct flintdb_meta *m, const char *name);
-
-    struct flintdb_row * flintdb_row_new(struct flintdb_meta *meta, char **e);
-    void flintdb_print_row(const struct flintdb_row *r);
-
-    struct flintdb_table * flintdb_table_open(const char *file, int mode, const struct flintdb_meta *meta, char **e);
-    int flintdb_table_drop(const char *file, char **e);
-
-    struct flintdb_genericfile * flintdb_genericfile_open(const char *file, int mode, const struct flintdb_meta *meta, char **e);
-    void flintdb_genericfile_drop(const char *file, char **e);
-
-    struct flintdb_filesort * flintdb_filesort_new(const char *file, const struct flintdb_meta *m, char **e);
-
-    struct flintdb_aggregate* aggregate_new(const char *id, struct flintdb_aggregate_groupby **groupby, u16 groupby_count,
-                                           struct flintdb_aggregate_func **funcs, u16 func_count, char **e);
-    struct flintdb_aggregate_groupby* groupby_new(const char *alias, const char *column, enum flintdb_variant_type type, char **e);
-
-    struct flintdb_aggregate_func * flintdb_func_count(const char *name, const char *alias, enum flintdb_variant_type type,
-                                                      struct flintdb_aggregate_condition cond, char **e);
-    struct flintdb_aggregate_func * flintdb_func_sum(const char *name, const char *alias, enum flintdb_variant_type type,
-                                                    struct flintdb_aggregate_condition cond, char **e);
-    struct flintdb_aggregate_func * flintdb_func_avg(const char *name, const char *alias, enum flintdb_variant_type type,
-                                                    struct flintdb_aggregate_condition cond, char **e);
-
-    struct flintdb_sql_result* flintdb_sql_exec(const char *sql, const void *transaction, char **e);
-    
-    void flintdb_cleanup(char **e);
-    """
-)
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Union
+
+try:
+    from _flintdb import ffi, lib as _lib
+except ImportError as ex:
+    raise RuntimeError("Could not import the FlintDB cffi extension; run `python3 flintdb_build.py` first") from ex
 
 
-# libc malloc/free for ownership-transfer cases (e.g., aggregate_new consumes arrays)
-ffi.cdef("void *malloc(size_t size); void free(void *ptr);")
+# Bound once: ffi.NULL is otherwise an attribute lookup on every cursor step and
+# NULL check. Compare with ==/!= (NULL pointers from C are distinct objects).
+_NULL = ffi.NULL
 
 
 class FlintDBError(Exception):
     pass
 
 
-def _load_library():
-    lib_paths = [
-        "../../lib/libflintdb.so",
-        "../../lib/libflintdb.dylib",
-        "../../lib/libflintdb.dll",
-        "../../bin/flintdb",
-    ]
-    base = os.path.dirname(__file__)
-    for rel in lib_paths:
-        full = os.path.join(base, rel)
-        if os.path.exists(full):
-            return ffi.dlopen(full)
-    raise RuntimeError("Could not find FlintDB shared library")
-
-
-_lib = _load_library()
-_libc = ffi.dlopen(None)
-
-
 # Constants (match tutorial expectations)
 FLINTDB_RDONLY = os.O_RDONLY
 FLINTDB_RDWR = os.O_RDWR | os.O_CREAT
@@ -325,32 +59,346 @@ VARIANT_DECIMAL = 12
 SPEC_NOT_NULL = 1
 SPEC_PRIMARY_KEY = 2
 
+MAX_COLUMNS_LIMIT = 200
+CURSOR_FETCH_BATCH = 128
 MAX_COLUMN_NAME_LIMIT = 40
 PRIMARY_NAME = b"primary"
 
+# A trailing `LIMIT n` or `LIMIT offset, n` clause (Table.find_first).
+_LIMIT_RE = re.compile(r"\bLIMIT\s+-?\d+(\s*,\s*-?\d+)?\s*$", re.IGNORECASE)
+
+
+_tls = threading.local()
+
 
 def _err_ptr():
-    return ffi.new("char **")
+    # One reusable error slot per thread (the C side reports errors through a
+    # thread-local buffer too), reset to NULL before every call. Only for
+    # calls that run no Python while the slot is held: anything that calls
+    # back into Python or interleaves with caller code (comparators,
+    # generators) allocates its own slot, or that code could reset it.
+    e = getattr(_tls, "e", None)
+    if e is None:
+        e = _tls.e = ffi.new("char **")
+    e[0] = _NULL
+    return e
 
 
 def _raise_if_err(err) -> None:
-    if err[0] != ffi.NULL:
+    if err[0] != _NULL:
         msg = ffi.string(err[0]).decode("utf-8", "replace")
         raise FlintDBError(msg)
 
 
+@functools.lru_cache(maxsize=1024)
+def _enc(s: str) -> bytes:
+    # Column names, WHERE clauses and paths repeat a lot; encode each once.
+    return s.encode()
+
+
 def _to_cstr(s: Union[str, bytes]) -> bytes:
-    return s.encode() if isinstance(s, str) else s
+    return s if isinstance(s, bytes) else _enc(s)
+
+
+# Encoded STRING column values. Kept apart from _enc so that data values
+# (often unique) do not evict the names and clauses cached there; a plain dict
+# is cheaper per hit than an LRU and is simply cleared once full. bytes are
+# passed to C without a copy, so a hit costs no allocation at all.
+_STRING_CACHE: Dict[str, bytes] = {}
+_STRING_CACHE_LIMIT = 4096
+
+
+def _enc_value(s: Union[str, bytes]) -> bytes:
+    if isinstance(s, bytes):
+        return s
+    b = _STRING_CACHE.get(s)
+    if b is None:
+        if len(_STRING_CACHE) >= _STRING_CACHE_LIMIT:
+            _STRING_CACHE.clear()
+        b = _STRING_CACHE[s] = s.encode()
+    return b
+
+
+def _autoclose(obj, close, ptr) -> weakref.finalize:
+    """Release `ptr` with close(ptr) once `obj` is collected (or at exit).
+
+    Calling the returned finalizer releases it early; it runs at most once, so
+    close() followed by collection never double-frees. Only the pointer and its
+    release function are held, never `obj` itself.
+    """
+    return weakref.finalize(obj, close, ptr)
+
+
+def _closed(what: str) -> Callable:
+    """Stand-in for a cached vtable entry once its handle is closed."""
+
+    def call(*args):
+        raise FlintDBError(f"{what} is closed")
+
+    return call
+
+
+def _set_unsupported(r, i, v, e):
+    raise FlintDBError(f"Row.set: unsupported column type at index {i}")
+
+
+# Column type -> setter. The storage layer expects each value in its column's
+# variant type, so Row.set dispatches on the schema, not on type(value).
+_SETTER_BY_TYPE = {
+    _lib.VARIANT_INT8: lambda r, i, v, e: r.i8_set(r, i, v, e),
+    _lib.VARIANT_UINT8: lambda r, i, v, e: r.u8_set(r, i, v, e),
+    _lib.VARIANT_INT16: lambda r, i, v, e: r.i16_set(r, i, v, e),
+    _lib.VARIANT_UINT16: lambda r, i, v, e: r.u16_set(r, i, v, e),
+    _lib.VARIANT_INT32: lambda r, i, v, e: r.i32_set(r, i, v, e),
+    _lib.VARIANT_UINT32: lambda r, i, v, e: r.u32_set(r, i, v, e),
+    _lib.VARIANT_INT64: lambda r, i, v, e: r.i64_set(r, i, v, e),
+    _lib.VARIANT_DOUBLE: lambda r, i, v, e: r.f64_set(r, i, v, e),
+    _lib.VARIANT_FLOAT: lambda r, i, v, e: r.f64_set(r, i, v, e),
+    _lib.VARIANT_STRING: lambda r, i, v, e: r.string_set(r, i, _enc_value(v), e),
+    _lib.VARIANT_BYTES: lambda r, i, v, e: r.bytes_set(r, i, v, len(v), e),
+    _lib.VARIANT_UUID: lambda r, i, v, e: r.uuid_set(r, i, v, len(v), e),
+    _lib.VARIANT_IPV6: lambda r, i, v, e: r.ipv6_set(r, i, v, len(v), e),
+    _lib.VARIANT_DATE: lambda r, i, v, e: r.date_set(r, i, v, e),
+    _lib.VARIANT_TIME: lambda r, i, v, e: r.time_set(r, i, v, e),
+}
+
+# Column type -> (vtable setter, argument expression) and vtable getter, used
+# by Meta.make_row_class() to inline the typed call for each column.
+_SET_CODE_BY_TYPE = {
+    _lib.VARIANT_INT8: ("i8_set", "v"),
+    _lib.VARIANT_UINT8: ("u8_set", "v"),
+    _lib.VARIANT_INT16: ("i16_set", "v"),
+    _lib.VARIANT_UINT16: ("u16_set", "v"),
+    _lib.VARIANT_INT32: ("i32_set", "v"),
+    _lib.VARIANT_UINT32: ("u32_set", "v"),
+    _lib.VARIANT_INT64: ("i64_set", "v"),
+    _lib.VARIANT_DOUBLE: ("f64_set", "v"),
+    _lib.VARIANT_FLOAT: ("f64_set", "v"),
+    _lib.VARIANT_STRING: ("string_set", "_enc_value(v)"),
+    _lib.VARIANT_BYTES: ("bytes_set", "v, len(v)"),
+    _lib.VARIANT_UUID: ("uuid_set", "v, len(v)"),
+    _lib.VARIANT_IPV6: ("ipv6_set", "v, len(v)"),
+    _lib.VARIANT_DATE: ("date_set", "v"),
+    _lib.VARIANT_TIME: ("time_set", "v"),
+}
+_GET_CODE_BY_TYPE = {
+    _lib.VARIANT_INT8: "i8_get",
+    _lib.VARIANT_UINT8: "u8_get",
+    _lib.VARIANT_INT16: "i16_get",
+    _lib.VARIANT_UINT16: "u16_get",
+    _lib.VARIANT_INT32: "i32_get",
+    _lib.VARIANT_UINT32: "u32_get",
+    _lib.VARIANT_INT64: "i64_get",
+    _lib.VARIANT_DOUBLE: "f64_get",
+    _lib.VARIANT_FLOAT: "f64_get",
+    _lib.VARIANT_DATE: "date_get",
+    _lib.VARIANT_TIME: "time_get",
+}
+
+# Column type -> comparator compiled into the extension, for FileSort.sort_by().
+_CMP_BY_TYPE = {
+    t: ffi.addressof(_lib, "flintdb_py_cmp_i64")
+    for t in (_lib.VARIANT_INT8, _lib.VARIANT_UINT8, _lib.VARIANT_INT16, _lib.VARIANT_UINT16,
+              _lib.VARIANT_INT32, _lib.VARIANT_UINT32, _lib.VARIANT_INT64)
+}
+_CMP_BY_TYPE[_lib.VARIANT_DOUBLE] = _CMP_BY_TYPE[_lib.VARIANT_FLOAT] = ffi.addressof(_lib, "flintdb_py_cmp_f64")
+
+# Column type -> (kind, array typecode, accepted buffer formats) for
+# Table.apply_columns(); the kind selects the typed setter on the C side.
+_SOA_BY_TYPE = {
+    _lib.VARIANT_INT32: (b"i", "i", ("i",)),
+    _lib.VARIANT_INT64: (b"q", "q", ("q", "l")),
+    _lib.VARIANT_DOUBLE: (b"d", "d", ("d",)),
+    _lib.VARIANT_FLOAT: (b"d", "d", ("d",)),
+    _lib.VARIANT_STRING: (b"s", None, None),
+}
+
+
+def _soa_numbers(col, typecode: str, formats: Sequence[str]):
+    # Use a contiguous buffer of the right layout (array.array, NumPy) as-is;
+    # copy anything else into an array.array once.
+    try:
+        mv = memoryview(col)
+    except TypeError:
+        mv = None
+    if (mv is not None and mv.ndim == 1 and mv.c_contiguous
+            and mv.format.lstrip("@=") in formats and mv.itemsize == array.array(typecode).itemsize):
+        return col, len(mv), 0
+    a = array.array(typecode, col)
+    return a, len(a), 0
+
+
+def _soa_strings(col):
+    # NumPy 'S' arrays are already NUL-padded fixed-width strings; anything
+    # else is encoded and padded into one buffer.
+    try:
+        mv = memoryview(col)
+    except TypeError:
+        mv = None
+    if mv is not None and mv.ndim == 1 and mv.c_contiguous and mv.format.endswith("s"):
+        return col, len(mv), mv.itemsize
+    enc = []
+    for v in col:
+        if isinstance(v, str):
+            v = v.encode()
+        elif not isinstance(v, bytes):
+            # No NULL (or implicit str()) in column-wise input: a None would
+            # otherwise be stored as the text "None".
+            raise FlintDBError(f"STRING column values must be str or bytes, got {type(v).__name__}")
+        enc.append(v)
+    width = max(map(len, enc), default=0) or 1
+    return b"".join(v.ljust(width, b"\0") for v in enc), len(enc), width
+
+
+def _soa_pack(types: bytes, columns: Sequence, who: str):
+    # Validate and lay out one buffer per column for the *_columns C helpers.
+    # Returns (buffers to keep alive, void*[] of them, kinds, int[] widths, rows).
+    if len(columns) != len(types):
+        raise FlintDBError(f"{who}: expected {len(types)} columns, got {len(columns)}")
+    bufs = []
+    kinds = bytearray()
+    widths = []
+    n = None
+    for i, (t, col) in enumerate(zip(types, columns)):
+        soa = _SOA_BY_TYPE.get(t)
+        if soa is None:
+            raise FlintDBError(f"{who}: unsupported column type at index {i}")
+        kind, typecode, formats = soa
+        try:
+            buf, length, width = _soa_strings(col) if typecode is None else _soa_numbers(col, typecode, formats)
+        except FlintDBError as ex:
+            raise FlintDBError(f"{who}: column {i}: {ex}") from None
+        if n is None:
+            n = length
+        elif length != n:
+            raise FlintDBError(f"{who}: column {i} has {length} values, expected {n}")
+        bufs.append(buf)
+        kinds += kind
+        widths.append(width)
+    cols = ffi.new("void *[]", [ffi.from_buffer(b) for b in bufs])
+    return bufs, cols, bytes(kinds), ffi.new("int[]", widths), n or 0
+
+
+# Schema fingerprint (one type byte per column) -> tuple of setters.
+_SETTERS_BY_FINGERPRINT: dict = {}
+
+
+def _column_types(meta_ptr) -> bytes:
+    """Column types of a schema, one VARIANT_* byte per column."""
+    buf = ffi.new("char[]", MAX_COLUMNS_LIMIT)
+    n = _lib.flintdb_py_meta_column_types(meta_ptr, buf, MAX_COLUMNS_LIMIT)
+    return ffi.unpack(buf, max(n, 0))
+
+
+def _column_names(meta_ptr) -> List[str]:
+    names = []
+    while True:
+        p = _lib.flintdb_py_meta_column_name(meta_ptr, len(names))
+        if p == _NULL:
+            return names
+        names.append(ffi.string(p).decode("utf-8", "replace"))
+
+
+def _column_setters(meta_ptr) -> tuple:
+    fingerprint = _column_types(meta_ptr)
+    setters = _SETTERS_BY_FINGERPRINT.get(fingerprint)
+    if setters is None:
+        setters = tuple(_SETTER_BY_TYPE.get(t, _set_unsupported) for t in fingerprint)
+        _SETTERS_BY_FINGERPRINT[fingerprint] = setters
+    return setters
+
+
+def _pack_keys(keys: Sequence[str]) -> bytearray:
+    # NUL-padded MAX_COLUMN_NAME_LIMIT-byte slots, the layout of `char keys[][40]`.
+    buf = bytearray(len(keys) * MAX_COLUMN_NAME_LIMIT)
+    for i, k in enumerate(keys):
+        kb = _to_cstr(k)[:MAX_COLUMN_NAME_LIMIT - 1]
+        off = i * MAX_COLUMN_NAME_LIMIT
+        buf[off:off + len(kb)] = kb
+    return buf
+
+
+@dataclass(frozen=True)
+class Column:
+    """One column for Meta.from_schema(); fields follow Meta.add_column()."""
+
+    name: str
+    variant_type: int
+    size: int = 0
+    precision: int = 0
+    spec: int = 0
+    default: str = ""
+    comment: str = ""
 
 
 class Meta:
+    _finalizer = None
+
     def __init__(self, filepath: str):
+        self._setters = None
+        self._row_class = None
+        self._index_map = None
+        self._validator = None
+        self._sql_buf = None
         err = _err_ptr()
         self._path = _to_cstr(filepath)
         self._m = _lib.flintdb_meta_new_ptr(self._path, err)
         _raise_if_err(err)
-        if self._m == ffi.NULL:
+        if self._m == _NULL:
             raise FlintDBError("meta_new_ptr returned NULL")
+        self._finalizer = _autoclose(self, _lib.flintdb_meta_free_ptr, self._m)
+
+    @classmethod
+    def from_schema(
+        cls,
+        filepath: str,
+        columns: Sequence[Union[Column, tuple]],
+        indexes: Sequence[tuple] = (),
+    ) -> "Meta":
+        """Build a schema with all its columns and indexes in a single C call.
+
+        `columns` holds Column entries or tuples in add_column() argument order;
+        `indexes` holds (name, algorithm, keys) tuples as for add_index():
+
+            mt = Meta.from_schema(path, [
+                Column("id", VARIANT_INT64, spec=SPEC_NOT_NULL, default="0"),
+                ("name", VARIANT_STRING, 50),
+            ], indexes=[("primary", None, ["id"])])
+        """
+        cols = [c if isinstance(c, Column) else Column(*c) for c in columns]
+        meta = cls(filepath)
+        # ffi.new() buffers referenced by the definition arrays; kept alive for the call.
+        keep = []
+
+        def cstr(v):
+            if v is None:
+                return _NULL
+            b = ffi.new("char[]", _to_cstr(v))
+            keep.append(b)
+            return b
+
+        col_defs = ffi.new("struct flintdb_py_column_def[]", len(cols))
+        for d, c in zip(col_defs, cols):
+            d.name = cstr(c.name)
+            d.type = c.variant_type
+            d.size = int(c.size)
+            d.precision = int(c.precision)
+            d.spec = int(c.spec)
+            d.value = cstr(c.default)
+            d.comment = cstr(c.comment)
+        ix_defs = ffi.new("struct flintdb_py_index_def[]", len(indexes))
+        for d, (name, algorithm, keys) in zip(ix_defs, indexes):
+            d.name = cstr(name)
+            d.algorithm = cstr(algorithm)
+            d.keys = cstr(bytes(_pack_keys(keys)))
+            d.key_count = len(keys)
+
+        err = _err_ptr()
+        _lib.flintdb_py_meta_build(meta._m, col_defs, len(cols), ix_defs, len(indexes), err)
+        if err[0] != _NULL:
+            meta.close()
+            _raise_if_err(err)
+        return meta
 
     def add_column(
         self,
@@ -374,38 +422,96 @@ class Meta:
             _to_cstr(comment),
             err,
         )
+        self._setters = None
+        self._row_class = None
+        self._index_map = None
+        self._validator = None
         _raise_if_err(err)
 
     def add_index(self, name: str, algorithm: Optional[str], keys: Sequence[str]) -> None:
         err = _err_ptr()
         key_count = len(keys)
-        keys_arr = ffi.new(f"char[{key_count}][{MAX_COLUMN_NAME_LIMIT}]")
-        for i, k in enumerate(keys):
-            kb = _to_cstr(k)
-            n = min(len(kb), MAX_COLUMN_NAME_LIMIT - 1)
-            ffi.memmove(keys_arr[i], kb, n)
-
+        # Pack the NUL-padded key names into one zeroed buffer and hand it to C as-is.
+        keys_arr = ffi.from_buffer(f"char[][{MAX_COLUMN_NAME_LIMIT}]", _pack_keys(keys))
 
-        algo_b = ffi.NULL if algorithm is None else _to_cstr(algorithm)
+        algo_b = _NULL if algorithm is None else _to_cstr(algorithm)
         _lib.flintdb_meta_indexes_add(self._m, _to_cstr(name), algo_b, keys_arr, key_count, err)
         _raise_if_err(err)
 
     def to_sql_string(self) -> str:
+        buf = self._sql_buf
+        if buf is None:
+            buf = self._sql_buf = ffi.new("char[]", 8192)
         err = _err_ptr()
-        buf = ffi.new("char[]", 8192)
         rc = _lib.flintdb_meta_to_sql_string(self._m, buf, 8192, err)
         _raise_if_err(err)
         if rc < 0:
             raise FlintDBError("flintdb_meta_to_sql_string failed")
         return ffi.string(buf).decode("utf-8", "replace")
 
+    def _column_setters(self) -> tuple:
+        if self._setters is None:
+            self._setters = _column_setters(self._m)
+        return self._setters
+
+    def make_row_class(self) -> type:
+        """Return a Row subclass specialized for this schema (built once, cached).
+
+        Each column gets `set_<name>(v)` (and `get_<name>()` where the type has a
+        scalar getter) with its index and typed vtable call baked in, plus a
+        `<name>` property when the name does not clash with Row:
+
+            UserRow = meta.make_row_class()
+            with UserRow(meta) as row:
+                row.id = 42  # r.i64_set(r, 0, 42, err)
+        """
+        if self._row_class is None:
+            self._row_class = _make_row_class(self)
+        return self._row_class
+
+    @property
+    def index_map(self) -> Dict[str, int]:
+        """Column name -> index, built once per schema (in column order)."""
+        if self._index_map is None:
+            self._index_map = {name: i for i, name in enumerate(_column_names(self._m))}
+        return self._index_map
+
     def column_at(self, name: str) -> int:
-        return int(_lib.flintdb_column_at(self._m, _to_cstr(name)))
+        i = self.index_map.get(name)
+        if i is None:
+            # libflintdb also matches names case-insensitively (or returns -1)
+            i = int(_lib.flintdb_column_at(self._m, _to_cstr(name)))
+        return i
+
+    def freeze(self, assigned: Iterable[Union[int, str]] = ()) -> "FastValidator":
+        """Specialize row validation for rows built from this schema.
+
+        `assigned` lists the columns (indices or names) the caller always sets
+        to a non-NULL value. A row starts from its schema defaults, so if every
+        NOT NULL column has a default or is in `assigned`, Row.validate() on
+        rows created afterwards returns True without calling into C. Adding a
+        column drops the validator.
+        """
+        self._validator = self._validator_for(assigned)
+        return self._validator
+
+    def _validator_for(self, assigned: Iterable[Union[int, str]]) -> "FastValidator":
+        # freeze() without installing the result on the schema.
+        ncols = len(self.index_map)
+        cols = set()
+        for c in assigned:
+            i = c if isinstance(c, int) else self.column_at(c)
+            if not 0 <= i < ncols:
+                raise FlintDBError(f"Meta.freeze: unknown column {c!r}")
+            cols.add(i)
+        out = ffi.new("int[]", MAX_COLUMNS_LIMIT)
+        n = _lib.flintdb_py_meta_required_columns(self._m, out, MAX_COLUMNS_LIMIT)
+        return FastValidator(frozenset(ffi.unpack(out, max(n, 0))) - cols)
 
     def close(self) -> None:
-        if getattr(self, "_m", ffi.NULL) != ffi.NULL:
-            _lib.flintdb_meta_free_ptr(self._m)
-            self._m = ffi.NULL
+        if self._finalizer is not None:
+            self._finalizer()
+        self._m = _NULL
 
     def __enter__(self) -> "Meta":
         return self
@@ -414,72 +520,205 @@ class Meta:
         self.close()
 
 
+class FastValidator:
+    """Row validator returned by Meta.freeze().
+
+    `required` holds the NOT NULL columns a row could still be missing; when it
+    is empty (`trivial`), every row from the frozen schema is valid.
+    """
+
+    __slots__ = ("required", "trivial")
+
+    def __init__(self, required: frozenset):
+        self.required = required
+        self.trivial = not required
+
+    def __call__(self, row: "Row") -> bool:
+        if self.trivial:
+            return True
+        return row._validate_c()
+
+
+@functools.lru_cache(maxsize=None)
+def _variant_dtype():
+    # NumPy is optional: only Row.as_array() needs it.
+    import numpy as np
+
+    value = ffi.offsetof("struct flintdb_variant", "value")
+    return np.dtype({
+        "names": ["type", "i", "f"],
+        "formats": [np.int32, np.int64, np.float64],
+        "offsets": [ffi.offsetof("struct flintdb_variant", "type"), value, value],
+        "itemsize": ffi.sizeof("struct flintdb_variant"),
+    })
+
+
 class Row:
-    def __init__(self, meta: Meta, *, _ptr=None, _owned: bool = True):
-        self._owned = _owned
+    # vtable entries resolved on first use and cached on the wrapper as
+    # `_<name>`, so repeated calls skip the cdata attribute lookup. Every row
+    # comes from flintdb_row_new, so the entries stay valid if _r is re-pointed.
+    _VTABLE = frozenset({
+        "string_set", "i32_set", "i64_set", "f64_set",
+        "string_get", "bytes_get", "i32_get", "validate",
+    })
+    _finalizer = None
+    _validator = None
+
+    def __init__(self, meta: Meta, *, _ptr=None, _owned: bool = True, _owner: object = None):
+        self._setters = None
+        # The C row points into its owner (its Meta, or the table / cursor /
+        # sort / aggregate it came from); keep that alive as long as the row.
+        self._owner = meta if _ptr is None else _owner
         if _ptr is not None:
             self._r = _ptr
+            if _owned:
+                self._finalizer = _autoclose(self, _ptr.free, _ptr)
             return
 
         err = _err_ptr()
         self._r = _lib.flintdb_row_new(meta._m, err)
         _raise_if_err(err)
-        if self._r == ffi.NULL:
+        if self._r == _NULL:
             raise FlintDBError("row_new returned NULL")
+        self._finalizer = _autoclose(self, self._r.free, self._r)
+        self._setters = meta._column_setters()
+        self._validator = meta._validator
 
     @staticmethod
-    def borrowed(ptr) -> "Row":
-        return Row.__new_from_ptr(ptr, owned=False)
+    def borrowed(ptr, owner: object = None) -> "Row":
+        return Row.__new_from_ptr(ptr, owned=False, owner=owner)
 
     @staticmethod
-    def owned(ptr) -> "Row":
-        return Row.__new_from_ptr(ptr, owned=True)
+    def owned(ptr, owner: object = None) -> "Row":
+        return Row.__new_from_ptr(ptr, owned=True, owner=owner)
 
     @staticmethod
-    def __new_from_ptr(ptr, owned: bool) -> "Row":
+    def __new_from_ptr(ptr, owned: bool, owner: object) -> "Row":
         obj = Row.__new__(Row)
-        Row.__init__(obj, meta=None, _ptr=ptr, _owned=owned)  # type: ignore[arg-type]
+        Row.__init__(obj, meta=None, _ptr=ptr, _owned=owned, _owner=owner)  # type: ignore[arg-type]
         return obj
 
+    def __getattr__(self, name: str):
+        if name[:1] == "_" and name[1:] in Row._VTABLE:
+            if self._r == _NULL:
+                raise FlintDBError("row is closed")
+            fn = getattr(self._r, name[1:])
+            setattr(self, name, fn)
+            return fn
+        raise AttributeError(name)
+
     def _ptr(self):
         return self._r
 
+    def set(self, idx: int, value) -> None:
+        """Set a column using the setter that matches its declared type."""
+        r = self._r
+        if r == _NULL:
+            raise FlintDBError("row is closed")
+        setters = self._setters
+        if setters is None:
+            setters = self._setters = _column_setters(r.meta)
+        if not 0 <= idx < len(setters):
+            raise FlintDBError(f"Row.set: index {idx} out of bounds")
+        err = _err_ptr()
+        try:
+            setters[idx](r, idx, value, err)
+        except (TypeError, ValueError, AttributeError, OverflowError) as ex:
+            raise FlintDBError(f"Row.set: bad value {value!r} for column {idx} ({ex})") from None
+        _raise_if_err(err)
+
     def set_string(self, idx: int, value: str) -> None:
         err = _err_ptr()
-        self._r.string_set(self._r, idx, _to_cstr(value), err)
+        self._string_set(self._r, idx, _enc_value(value), err)
         _raise_if_err(err)
 
     def set_i32(self, idx: int, value: int) -> None:
         err = _err_ptr()
-        self._r.i32_set(self._r, idx, int(value), err)
+        self._i32_set(self._r, idx, value, err)
         _raise_if_err(err)
 
     def set_i64(self, idx: int, value: int) -> None:
         err = _err_ptr()
-        self._r.i64_set(self._r, idx, int(value), err)
+        self._i64_set(self._r, idx, value, err)
         _raise_if_err(err)
 
     def set_f64(self, idx: int, value: float) -> None:
         err = _err_ptr()
-        self._r.f64_set(self._r, idx, float(value), err)
+        self._f64_set(self._r, idx, value, err)
         _raise_if_err(err)
 
     def get_i32(self, idx: int) -> int:
         err = _err_ptr()
-        v = self._r.i32_get(self._r, idx, err)
+        v = self._i32_get(self._r, idx, err)
         _raise_if_err(err)
         return int(v)
 
+    def get_string(self, idx: int) -> Optional[str]:
+        r = self._r
+        if not 0 <= idx < r.length:
+            raise FlintDBError("row_string_get: index out of bounds")
+        v = r.array[idx]
+        if v.type == _lib.VARIANT_NULL:
+            return None
+        if v.type == _lib.VARIANT_STRING:
+            # The variant carries its length; copy exactly that many bytes
+            # instead of letting ffi.string() scan for the terminator (and
+            # without string_get's temp copy for non-terminated strings).
+            b = v.value.b
+            return ffi.buffer(b.data, b.length)[:].decode("utf-8", "replace")
+        err = _err_ptr()
+        p = self._string_get(r, idx, err)
+        _raise_if_err(err)
+        return None if p == _NULL else ffi.string(p).decode("utf-8", "replace")
+
+    def get_bytes(self, idx: int) -> Optional[bytes]:
+        err = _err_ptr()
+        n = ffi.new("u32 *")
+        p = self._bytes_get(self._r, idx, n, err)
+        _raise_if_err(err)
+        return None if p == _NULL else ffi.buffer(p, n[0])[:]
+
+    def reset(self) -> None:
+        """Put every column back to its schema default (or NULL) and clear the rowid."""
+        err = _err_ptr()
+        _lib.flintdb_py_row_reset(self._r, err)
+        _raise_if_err(err)
+
+    def as_array(self):
+        """Read-only NumPy view over the row's variant array (no copy).
+
+        Fields: `type` (VARIANT_*), `i` (integer columns) and `f` (DOUBLE/FLOAT
+        columns), e.g. `row.as_array()["i"][col]`. The view aliases the row's
+        C memory, so it is only valid while the row is (for borrowed rows,
+        until the next read/cursor step).
+        """
+        import numpy as np
+
+        r = self._r
+        buf = ffi.buffer(r.array, r.length * ffi.sizeof("struct flintdb_variant"))
+        arr = np.frombuffer(buf, dtype=_variant_dtype())
+        arr.flags.writeable = False
+        return arr
+
     def validate(self) -> bool:
+        v = self._validator
+        if v is not None:
+            return v(self)
+        return self._validate_c()
+
+    def _validate_c(self) -> bool:
         err = _err_ptr()
-        ok = self._r.validate(self._r, err)
+        ok = self._validate(self._r, err)
         _raise_if_err(err)
         return bool(ok)
 
     def close(self) -> None:
-        if getattr(self, "_r", ffi.NULL) != ffi.NULL and self._owned:
-            self._r.free(self._r)
-        self._r = ffi.NULL
+        if self._finalizer is not None:
+            self._finalizer()
+        self._r = _NULL
+        # Drop the cached vtable entries so a closed row fails in __getattr__.
+        for name in Row._VTABLE:
+            self.__dict__.pop("_" + name, None)
 
     def __enter__(self) -> "Row":
         return self
@@ -489,22 +728,123 @@ class Row:
 
 
 class CursorI64:
-    def __init__(self, cptr):
+    _finalizer = None
+    # Expected number of rowids, when known up front, and how many have been
+    # pulled from C so far (see __length_hint__).
+    _hint: Optional[int] = None
+    _pulled = 0
+
+    def __init__(self, cptr, parent: object = None, owned: bool = True):
         self._c = cptr
+        self._next = cptr.next
+        # Rowids already pulled from C but not yet handed out (iteration reads
+        # ahead); every consumer takes from here before stepping the C cursor.
+        self._pending = deque()
+        self._done = False
+        # Keep the object the cursor reads from alive until the cursor goes.
+        self._parent = parent
+        if owned:
+            self._finalizer = _autoclose(self, cptr.close, cptr)
 
     def next(self) -> int:
+        if self._pending:
+            return self._pending.popleft()
+        if self._done:
+            return -1
         err = _err_ptr()
-        v = self._c.next(self._c, err)
+        v = self._next(self._c, err)
         _raise_if_err(err)
+        if v < 0:
+            self._done = True
+        else:
+            self._pulled += 1
         return int(v)
 
+    def fetch_batch(self, n: int = CURSOR_FETCH_BATCH) -> List[int]:
+        """Return up to n rowids in one C call; fewer than n once the cursor is done."""
+        if self._c == _NULL:
+            raise FlintDBError("cursor is closed")
+        out = self._take_pending(n)
+        want = n - len(out)
+        if want > 0 and not self._done:
+            buf = ffi.new("i64[]", want)
+            err = _err_ptr()
+            k = _lib.flintdb_py_cursor_i64_fetch(self._c, buf, want, err)
+            _raise_if_err(err)
+            out += ffi.unpack(buf, k)
+            self._pulled += k
+            if k < want:
+                self._done = True
+        return out
+
+    def _take_pending(self, n: Optional[int] = None) -> List[int]:
+        # Hand out (and drop) up to n read-ahead rowids, for the bulk consumers.
+        pending = self._pending
+        if n is None or n >= len(pending):
+            out = list(pending)
+            pending.clear()
+            return out
+        return [pending.popleft() for _ in range(n)]
+
+    def _drain_args(self):
+        # (ids, nids, cursor) for the C helpers that consume the rest of this
+        # cursor: the read-ahead rowids first, then the C cursor unless it is
+        # already exhausted. The cursor counts as done afterwards.
+        if self._c == _NULL:
+            raise FlintDBError("cursor is closed")
+        pending = self._take_pending()
+        c = _NULL if self._done else self._c
+        self._done = True
+        ids = ffi.new("i64[]", pending) if pending else _NULL
+        return ids, len(pending), c
+
     def close(self) -> None:
-        if getattr(self, "_c", ffi.NULL) != ffi.NULL:
-            self._c.close(self._c)
-            self._c = ffi.NULL
+        if self._finalizer is not None:
+            self._finalizer()
+        self._c = _NULL
+        self._next = _closed("cursor")
+        # Nothing is handed out after close(), read ahead or not: next() and
+        # iteration go on to the closed handle and raise.
+        self._pending.clear()
+        self._done = False
 
     def __iter__(self):
-        return self
+        # Rowids are pulled from C CURSOR_FETCH_BATCH at a time into the
+        # cursor's own queue, so whatever is read ahead but not yet yielded
+        # (e.g. after a break) is still there for next() and the bulk
+        # consumers. The generator owns its buffer and error slot since it may
+        # be resumed after other calls; the handle is re-read per batch in
+        # case the cursor is closed in between.
+        pending = self._pending
+        fetch = _lib.flintdb_py_cursor_i64_fetch
+        cap = CURSOR_FETCH_BATCH
+        buf = ffi.new("i64[]", cap)
+        err = ffi.new("char **")
+        while True:
+            while pending:
+                yield pending.popleft()
+            if self._done:
+                return
+            k = fetch(self._c, buf, cap, err)
+            if err[0] != _NULL:
+                _raise_if_err(err)
+            pending.extend(ffi.unpack(buf, k))
+            self._pulled += k
+            if k < cap:
+                self._done = True
+
+    def __length_hint__(self) -> int:
+        # Lets list(cursor) and friends size their buffer once. Only set for an
+        # unfiltered find(), where the table's row count is exact and O(1);
+        # counts what is left: read-ahead rowids plus those still in C.
+        if self._hint is None:
+            return NotImplemented
+        if self._c == _NULL:
+            return 0
+        left = len(self._pending)
+        if not self._done:
+            left += max(self._hint - self._pulled, 0)
+        return left
 
     def __next__(self) -> int:
         v = self.next()
@@ -520,24 +860,50 @@ class CursorI64:
 
 
 class CursorRow:
-    def __init__(self, cptr):
+    _finalizer = None
+    _hint: Optional[int] = None
+    _pulled = 0
+
+    def __init__(self, cptr, parent: object = None, owned: bool = True):
         self._c = cptr
+        self._next = cptr.next
+        # Keep the object the cursor reads from alive until the cursor goes.
+        self._parent = parent
+        if owned:
+            self._finalizer = _autoclose(self, cptr.close, cptr)
 
     def next(self) -> Optional[Row]:
         err = _err_ptr()
-        r = self._c.next(self._c, err)
+        r = self._next(self._c, err)
         _raise_if_err(err)
-        if r == ffi.NULL:
+        if r == _NULL:
             return None
-        return Row.borrowed(r)
+        self._pulled += 1
+        return Row.borrowed(r, self)
 
     def close(self) -> None:
-        if getattr(self, "_c", ffi.NULL) != ffi.NULL:
-            self._c.close(self._c)
-            self._c = ffi.NULL
+        if self._finalizer is not None:
+            self._finalizer()
+        self._c = _NULL
+        self._next = _closed("cursor")
 
     def __iter__(self):
-        return self
+        # Scan loop with every lookup hoisted; the generator owns its error
+        # slot since it may be resumed after other calls (or on another thread).
+        c = self._c
+        nxt = self._next
+        borrow = Row.borrowed
+        NULL = _NULL
+        err = ffi.new("char **")
+        while True:
+            err[0] = NULL
+            r = nxt(c, err)
+            if err[0] != NULL:
+                _raise_if_err(err)
+            if r == NULL:
+                return
+            self._pulled += 1
+            yield borrow(r, self)
 
     def __next__(self) -> Row:
         r = self.next()
@@ -545,6 +911,11 @@ class CursorRow:
             raise StopIteration
         return r
 
+    def __length_hint__(self) -> int:
+        if self._hint is None:
+            return NotImplemented
+        return 0 if self._c == _NULL else max(self._hint - self._pulled, 0)
+
     def __enter__(self) -> "CursorRow":
         return self
 
@@ -553,52 +924,211 @@ class CursorRow:
 
 
 class Table:
+    _finalizer = None
+
     def __init__(self, filepath: str, mode: int, meta: Optional[Meta] = None):
         err = _err_ptr()
-        meta_ptr = ffi.NULL if meta is None else meta._m
+        meta_ptr = _NULL if meta is None else meta._m
         self._t = _lib.flintdb_table_open(_to_cstr(filepath), mode, meta_ptr, err)
         _raise_if_err(err)
-        if self._t == ffi.NULL:
+        if self._t == _NULL:
             raise FlintDBError("table_open returned NULL")
+        self._finalizer = _autoclose(self, self._t.close, self._t)
+        self._apply = self._t.apply
+        self._read = self._t.read
+
+    def _live(self):
+        # The handle for calls that do not go through the cached entries.
+        t = self._t
+        if t == _NULL:
+            raise FlintDBError("table is closed")
+        return t
 
     def apply(self, row: Row, check_dup: bool = False) -> int:
         err = _err_ptr()
-        rowid = self._t.apply(self._t, row._ptr(), 1 if check_dup else 0, err)
+        rowid = self._apply(self._t, row._ptr(), 1 if check_dup else 0, err)
         _raise_if_err(err)
         if rowid < 0:
             raise FlintDBError("apply returned < 0")
         return int(rowid)
 
+    def apply_many(self, rows: Sequence[Row], check_dup: bool = False) -> List[int]:
+        """Apply several rows in a single C call; returns their rowids."""
+        n = len(rows)
+        if n == 0:
+            return []
+        err = _err_ptr()
+        ptrs = ffi.new("struct flintdb_row *[]", [r._r for r in rows])
+        rowids = ffi.new("i64[]", n)
+        done = _lib.flintdb_py_table_apply_many(self._live(), ptrs, n, 1 if check_dup else 0, rowids, err)
+        _raise_if_err(err)
+        if done < n:
+            raise FlintDBError("apply returned < 0")
+        return list(rowids)
+
+    def apply_values(
+        self, meta: Meta, values: Iterable[Sequence], check_dup: bool = False, batch_size: int = 256
+    ) -> int:
+        """Insert rows given as tuples of column values (every column, in order).
+
+        The values are written into a small set of rows that is reused for every
+        batch, and each batch is applied in one C call, so there is no Row
+        allocation per record. Each row is validated before it is applied, and
+        a value its column cannot take (including None) raises FlintDBError.
+        Returns the number of rows applied.
+        """
+        setters = meta._column_setters()
+        ncols = len(setters)
+        # Every column gets a non-NULL value (None is rejected), so this is
+        # normally trivial and validation then costs nothing per row.
+        validator = meta._validator_for(range(ncols))
+        check = None if validator.trivial else validator
+        upsert = 1 if check_dup else 0
+        ptrs = ffi.new("struct flintdb_row *[]", batch_size)
+        rows: List[Row] = []
+        # Own error slot: `values` may be a generator that makes FlintDB calls
+        # of its own (which reuse the thread's slot) between our setter calls.
+        err = ffi.new("char **")
+        total = 0
+        n = 0
+        try:
+            for vals in values:
+                if len(vals) != ncols:
+                    raise FlintDBError(f"apply_values: expected {ncols} values, got {len(vals)}")
+                if n == len(rows):
+                    rows.append(Row(meta))
+                    ptrs[n] = rows[n]._r
+                r = ptrs[n]
+                # apply() stamps the row with its rowid; clear it so the next
+                # apply inserts instead of overwriting that row.
+                r.rowid = -1
+                for i, v in enumerate(vals):
+                    try:
+                        setters[i](r, i, v, err)
+                    except (TypeError, ValueError, AttributeError, OverflowError) as ex:
+                        what = "NULL is not supported" if v is None else f"bad value {v!r} ({ex})"
+                        raise FlintDBError(f"apply_values: row {total + n}, column {i}: {what}") from None
+                    if err[0] != _NULL:
+                        _raise_if_err(err)
+                if check is not None and not check(rows[n]):
+                    raise FlintDBError(f"apply_values: row {total + n} failed validation")
+                n += 1
+                if n == batch_size:
+                    total += self._apply_batch(ptrs, n, upsert)
+                    n = 0
+            if n:
+                total += self._apply_batch(ptrs, n, upsert)
+        finally:
+            for row in rows:
+                row.close()
+        return total
+
+    def apply_columns(self, meta: Meta, columns: Sequence, check_dup: bool = False) -> int:
+        """Insert rows given column-wise, one sequence per column (structure of arrays).
+
+        INT32/INT64/DOUBLE/FLOAT columns take numbers and STRING columns take
+        str/bytes. Contiguous buffers of the matching type (array.array,
+        NumPy int32/int64/float64/'S' arrays) are used without copying. All
+        records are written into one reused row and applied in a single C
+        call. Returns the number of rows applied.
+        """
+        bufs, cols, kinds, widths, n = _soa_pack(_column_types(meta._m), columns, "apply_columns")
+        if not n:
+            return 0
+
+        t = self._live()
+        with Row(meta) as row:
+            err = _err_ptr()
+            done = _lib.flintdb_py_table_apply_columns(
+                t, row._r, n, cols, kinds, widths, len(bufs), 1 if check_dup else 0, err,
+            )
+            _raise_if_err(err)
+        if done < n:
+            raise FlintDBError("apply returned < 0")
+        return int(done)
+
+    def print_rows(self, cursor: CursorI64) -> int:
+        """Read and print every row the cursor yields, inside one C call.
+
+        Output matches print_row() per row, with a single flush at the end.
+        Returns the number of rows printed.
+        """
+        t = self._live()
+        sys.stdout.flush()
+        ids, nids, c = cursor._drain_args()
+        err = _err_ptr()
+        n = _lib.flintdb_py_table_print(t, ids, nids, c, err)
+        _raise_if_err(err)
+        return int(n)
+
+    def _apply_batch(self, ptrs, n: int, upsert: int) -> int:
+        err = _err_ptr()
+        done = _lib.flintdb_py_table_apply_many(self._live(), ptrs, n, upsert, _NULL, err)
+        _raise_if_err(err)
+        if done < n:
+            raise FlintDBError("apply returned < 0")
+        return n
+
     def delete_at(self, rowid: int) -> int:
+        t = self._live()
         err = _err_ptr()
-        r = self._t.delete_at(self._t, int(rowid), err)
+        r = t.delete_at(t, int(rowid), err)
         _raise_if_err(err)
         return int(r)
 
     def find(self, where: str = "") -> CursorI64:
+        t = self._live()
         err = _err_ptr()
-        c = self._t.find(self._t, _to_cstr(where), err)
+        c = t.find(t, _to_cstr(where), err)
         _raise_if_err(err)
-        if c == ffi.NULL:
+        if c == _NULL:
             raise FlintDBError("find returned NULL")
-        return CursorI64(c)
+        cursor = CursorI64(c, self)
+        if not where.strip():
+            n = self.rows()
+            if n >= 0:
+                cursor._hint = n
+        return cursor
+
+    def find_first(self, where: str = "") -> int:
+        """Rowid of the first row matching `where`, or -1 when nothing matches.
+
+        Opens, steps and closes the cursor in one C call; `LIMIT 1` is added
+        unless the clause already has a LIMIT, so the scan stops at the match.
+        """
+        if not _LIMIT_RE.search(where):
+            where = f"{where} LIMIT 1"
+        t = self._live()
+        err = _err_ptr()
+        rowid = _lib.flintdb_py_table_find_first(t, _to_cstr(where), err)
+        _raise_if_err(err)
+        return int(rowid)
+
+    def rows(self) -> int:
+        """Number of rows in the table (the primary index count; O(1))."""
+        t = self._live()
+        err = _err_ptr()
+        n = t.rows(t, err)
+        _raise_if_err(err)
+        return int(n)
 
     def read(self, rowid: int) -> Row:
         err = _err_ptr()
-        r = self._t.read(self._t, int(rowid), err)
+        r = self._read(self._t, int(rowid), err)
         _raise_if_err(err)
-        if r == ffi.NULL:
+        if r == _NULL:
             raise FlintDBError("read returned NULL")
-        return Row.borrowed(ffi.cast("struct flintdb_row *", r))
+        return Row.borrowed(ffi.cast("struct flintdb_row *", r), self)
 
     def close(self) -> None:
-        if getattr(self, "_t", ffi.NULL) != ffi.NULL:
-            self._t.close(self._t)
-            self._t = ffi.NULL
+        if self._finalizer is not None:
+            self._finalizer()
+        self._t = _NULL
+        self._apply = self._read = _closed("table")
 
     @staticmethod
     def drop(filepath: str) -> None:
-        _lib.flintdb_table_drop(_to_cstr(filepath), ffi.NULL)
+        _lib.flintdb_table_drop(_to_cstr(filepath), _NULL)
 
     def __enter__(self) -> "Table":
         return self
@@ -608,13 +1138,16 @@ class Table:
 
 
 class GenericFile:
+    _finalizer = None
+
     def __init__(self, filepath: str, mode: int, meta: Optional[Meta] = None):
         err = _err_ptr()
-        meta_ptr = ffi.NULL if meta is None else meta._m
+        meta_ptr = _NULL if meta is None else meta._m
         self._g = _lib.flintdb_genericfile_open(_to_cstr(filepath), mode, meta_ptr, err)
         _raise_if_err(err)
-        if self._g == ffi.NULL:
+        if self._g == _NULL:
             raise FlintDBError("genericfile_open returned NULL")
+        self._finalizer = _autoclose(self, self._g.close, self._g)
 
     def write(self, row: Row) -> int:
         err = _err_ptr()
@@ -626,18 +1159,29 @@ class GenericFile:
         err = _err_ptr()
         c = self._g.find(self._g, _to_cstr(where), err)
         _raise_if_err(err)
-        if c == ffi.NULL:
+        if c == _NULL:
             raise FlintDBError("genericfile.find returned NULL")
-        return CursorRow(c)
+        cursor = CursorRow(c, self)
+        if not where.strip():
+            n = self.rows()
+            if n >= 0:
+                cursor._hint = n
+        return cursor
+
+    def rows(self) -> int:
+        err = _err_ptr()
+        n = self._g.rows(self._g, err)
+        _raise_if_err(err)
+        return int(n)
 
     def close(self) -> None:
-        if getattr(self, "_g", ffi.NULL) != ffi.NULL:
-            self._g.close(self._g)
-            self._g = ffi.NULL
+        if self._finalizer is not None:
+            self._finalizer()
+        self._g = _NULL
 
     @staticmethod
     def drop(filepath: str) -> None:
-        _lib.flintdb_genericfile_drop(_to_cstr(filepath), ffi.NULL)
+        _lib.flintdb_genericfile_drop(_to_cstr(filepath), _NULL)
 
     def __enter__(self) -> "GenericFile":
         return self
@@ -646,13 +1190,28 @@ class GenericFile:
         self.close()
 
 
+@ffi.def_extern()
+def flintdb_py_row_cmp(handle, a, b):
+    compare, ctx, ra, rb = ffi.from_handle(handle)
+    if ra is None:
+        return int(compare(ctx, a, b))
+    ra._r = a
+    rb._r = b
+    return int(compare(ctx, ra, rb))
+
+
 class FileSort:
+    _finalizer = None
+
     def __init__(self, filepath: str, meta: Meta):
         err = _err_ptr()
         self._fs = _lib.flintdb_filesort_new(_to_cstr(filepath), meta._m, err)
         _raise_if_err(err)
-        if self._fs == ffi.NULL:
+        if self._fs == _NULL:
             raise FlintDBError("filesort_new returned NULL")
+        self._finalizer = _autoclose(self, self._fs.close, self._fs)
+        self._meta = meta
+        self._types = _column_types(meta._m)
 
     def add(self, row: Row) -> int:
         err = _err_ptr()
@@ -660,6 +1219,25 @@ class FileSort:
         _raise_if_err(err)
         return int(n)
 
+    def add_columns(self, columns: Sequence) -> int:
+        """Add rows given column-wise, one sequence per column, in a single C call.
+
+        Columns follow Table.apply_columns(): numbers for INT32/INT64/DOUBLE/FLOAT
+        and str/bytes for STRING, with array.array and NumPy buffers of the
+        matching type used without copying. Returns the number of rows added.
+        """
+        bufs, cols, kinds, widths, n = _soa_pack(self._types, columns, "FileSort.add_columns")
+        if not n:
+            return 0
+
+        with Row(self._meta) as row:
+            err = _err_ptr()
+            done = _lib.flintdb_py_filesort_add_columns(self._fs, row._r, n, cols, kinds, widths, len(bufs), err)
+            _raise_if_err(err)
+        if done < n:
+            raise FlintDBError("filesort add returned < 0")
+        return int(done)
+
     def rows(self) -> int:
         return int(self._fs.rows(self._fs))
 
@@ -667,27 +1245,72 @@ class FileSort:
         err = _err_ptr()
         r = self._fs.read(self._fs, int(i), err)
         _raise_if_err(err)
-        if r == ffi.NULL:
+        if r == _NULL:
             raise FlintDBError("filesort.read returned NULL")
-        return Row.owned(r)
-
-    def sort(self, compare: Callable[[object, Row, Row], int], ctx: object = None) -> int:
-        err = _err_ptr()
+        return Row.owned(r, self)
+
+    def sort(self, compare: Callable[[object, Row, Row], int], ctx: object = None, compare_raw: bool = False) -> int:
+        """Sort rows with compare(ctx, a, b).
+
+        a and b are two Row wrappers re-pointed at each pair, so they are only
+        valid inside the call. With compare_raw=True the comparator receives
+        the raw `const struct flintdb_row *` pointers instead.
+        """
+        # Own error slot: the comparator runs Python (often FlintDB calls,
+        # which reuse the thread's slot) while this call is in progress.
+        err = ffi.new("char **")
+        # The comparator and its ctx travel through the C ctx pointer, so the one
+        # extern "Python" callback serves every sort (and nested/threaded sorts).
+        if compare_raw:
+            handle = ffi.new_handle((compare, ctx, None, None))
+        else:
+            handle = ffi.new_handle((compare, ctx, Row.borrowed(_NULL, self), Row.borrowed(_NULL, self)))
+        n = self._fs.sort(self._fs, _lib.flintdb_py_row_cmp, handle, err)
+        _raise_if_err(err)
+        return int(n)
 
-        @ffi.callback("int(const void *, const struct flintdb_row *, const struct flintdb_row *)")
-        def _cmpr(_ctx, a, b):
-            ra = Row.borrowed(ffi.cast("struct flintdb_row *", a))
-            rb = Row.borrowed(ffi.cast("struct flintdb_row *", b))
-            return int(compare(ctx, ra, rb))
+    def sort_by(self, column: int, descending: bool = False) -> int:
+        """Sort by one numeric column using a comparator compiled into the extension.
 
-        n = self._fs.sort(self._fs, _cmpr, ffi.NULL, err)
+        Unlike sort(), no Python code runs per comparison. Integer columns are
+        compared as i64 and DOUBLE/FLOAT columns as f64.
+        """
+        cmp = _CMP_BY_TYPE.get(self._types[column]) if 0 <= column < len(self._types) else None
+        if cmp is None:
+            raise FlintDBError(f"FileSort.sort_by: column {column} is not numeric")
+        ctx = ffi.new("int[2]", [column, -1 if descending else 1])
+        err = _err_ptr()
+        n = self._fs.sort(self._fs, cmp, ctx, err)
         _raise_if_err(err)
         return int(n)
 
+    def argsort(self, column: int, descending: bool = False):
+        """Row order by one numeric column, sorted in NumPy instead of per-pair callbacks.
+
+        The keys are read out in one C call into an int64 (or float64) array and
+        ordered with a stable np.argsort; ties keep insertion order. The file is
+        left as is (sort_by() reorders it), so read rows in key order with
+        `fs.read(i) for i in fs.argsort(col)`.
+        """
+        import numpy as np
+
+        if not (0 <= column < len(self._types) and self._types[column] in _CMP_BY_TYPE):
+            raise FlintDBError(f"FileSort.argsort: column {column} is not numeric")
+        as_f64 = self._types[column] in (_lib.VARIANT_DOUBLE, _lib.VARIANT_FLOAT)
+        n = self.rows()
+        keys = np.empty(n, dtype=np.float64 if as_f64 else np.int64)
+        err = _err_ptr()
+        _lib.flintdb_py_filesort_keys(self._fs, column, 1 if as_f64 else 0, ffi.from_buffer(keys), n, err)
+        _raise_if_err(err)
+        if not descending:
+            return np.argsort(keys, kind="stable")
+        # Stable descending: sort the reversed keys, then map back.
+        return (n - 1 - np.argsort(keys[::-1], kind="stable"))[::-1]
+
     def close(self) -> None:
-        if getattr(self, "_fs", ffi.NULL) != ffi.NULL:
-            self._fs.close(self._fs)
-            self._fs = ffi.NULL
+        if self._finalizer is not None:
+            self._finalizer()
+        self._fs = _NULL
 
     def __enter__(self) -> "FileSort":
         return self
@@ -697,72 +1320,93 @@ class FileSort:
 
 
 class GroupBy:
+    _finalizer = None
+
     def __init__(self, ptr, owned: bool = True):
         self._gb = ptr
-        self._owned = owned
+        if owned:
+            self._finalizer = _autoclose(self, ptr.free, ptr)
 
     def close(self) -> None:
-        if self._owned and getattr(self, "_gb", ffi.NULL) != ffi.NULL:
-            self._gb.free(self._gb)
-            self._gb = ffi.NULL
+        if self._finalizer is not None:
+            self._finalizer()
+        self._gb = _NULL
 
 
 class AggFunc:
+    _finalizer = None
+
     def __init__(self, ptr, owned: bool = True):
         self._f = ptr
-        self._owned = owned
+        if owned:
+            self._finalizer = _autoclose(self, ptr.free, ptr)
 
     def close(self) -> None:
-        if self._owned and getattr(self, "_f", ffi.NULL) != ffi.NULL:
-            self._f.free(self._f)
-            self._f = ffi.NULL
+        if self._finalizer is not None:
+            self._finalizer()
+        self._f = _NULL
 
 
 def groupby_new(alias: str, column: str, variant_type: int) -> GroupBy:
     err = _err_ptr()
     gb = _lib.groupby_new(_to_cstr(alias), _to_cstr(column), variant_type, err)
     _raise_if_err(err)
-    if gb == ffi.NULL:
+    if gb == _NULL:
         raise FlintDBError("groupby_new returned NULL")
     return GroupBy(gb, owned=True)
 
 
-def _empty_cond():
-    c = ffi.new("struct flintdb_aggregate_condition *")
-    c.ok = ffi.NULL
-    return c[0]
+# "No condition" is passed by value to every func_* constructor; build it once.
+_EMPTY_COND = ffi.new("struct flintdb_aggregate_condition *")
+_EMPTY_COND.ok = _NULL
+_EMPTY_COND_V = _EMPTY_COND[0]
 
 
 def func_count(name: str, alias: str, variant_type: int) -> AggFunc:
     err = _err_ptr()
-    f = _lib.flintdb_func_count(_to_cstr(name), _to_cstr(alias), variant_type, _empty_cond(), err)
+    f = _lib.flintdb_func_count(_to_cstr(name), _to_cstr(alias), variant_type, _EMPTY_COND_V, err)
     _raise_if_err(err)
-    if f == ffi.NULL:
+    if f == _NULL:
         raise FlintDBError("func_count returned NULL")
     return AggFunc(f, owned=True)
 
 
 def func_sum(name: str, alias: str, variant_type: int) -> AggFunc:
     err = _err_ptr()
-    f = _lib.flintdb_func_sum(_to_cstr(name), _to_cstr(alias), variant_type, _empty_cond(), err)
+    f = _lib.flintdb_func_sum(_to_cstr(name), _to_cstr(alias), variant_type, _EMPTY_COND_V, err)
     _raise_if_err(err)
-    if f == ffi.NULL:
+    if f == _NULL:
         raise FlintDBError("func_sum returned NULL")
     return AggFunc(f, owned=True)
 
 
 def func_avg(name: str, alias: str, variant_type: int) -> AggFunc:
     err = _err_ptr()
-    f = _lib.flintdb_func_avg(_to_cstr(name), _to_cstr(alias), variant_type, _empty_cond(), err)
+    f = _lib.flintdb_func_avg(_to_cstr(name), _to_cstr(alias), variant_type, _EMPTY_COND_V, err)
     _raise_if_err(err)
-    if f == ffi.NULL:
+    if f == _NULL:
         raise FlintDBError("func_avg returned NULL")
     return AggFunc(f, owned=True)
 
 
+def _malloc_ptr_array(ctype: str, ptrs: list):
+    if not ptrs:
+        return _NULL
+    src = ffi.new(f"{ctype}[]", ptrs)
+    size = ffi.sizeof(src)
+    mem = _lib.malloc(size)
+    if mem == _NULL:
+        raise MemoryError()
+    ffi.memmove(mem, src, size)
+    return ffi.cast(f"{ctype} *", mem)
+
+
 class Aggregate:
+    _finalizer = None
+
     def __init__(self, ptr):
         self._agg = ptr
+        self._finalizer = _autoclose(self, ptr.free, ptr)
 
     @staticmethod
     def build(agg_id: str, groupbys: Sequence[GroupBy], funcs: Sequence[AggFunc]) -> "Aggregate":
@@ -771,53 +1415,116 @@ class Aggregate:
         gb_count = len(groupbys)
         fn_count = len(funcs)
 
-        # Allocate pointer arrays with libc malloc because aggregate_new takes ownership and frees them.
-        gb_mem = _libc.malloc(ffi.sizeof("struct flintdb_aggregate_groupby *") * gb_count) if gb_count else ffi.NULL
-        fn_mem = _libc.malloc(ffi.sizeof("struct flintdb_aggregate_func *") * fn_count) if fn_count else ffi.NULL
-
-        gb_arr = ffi.cast("struct flintdb_aggregate_groupby **", gb_mem) if gb_count else ffi.NULL
-        fn_arr = ffi.cast("struct flintdb_aggregate_func **", fn_mem) if fn_count else ffi.NULL
+        # aggregate_new takes ownership of both pointer arrays and frees them, so they
+        # must come from libc malloc; fill each with one memmove from a typed cffi array.
+        gb_arr = _malloc_ptr_array("struct flintdb_aggregate_groupby *", [gb._gb for gb in groupbys])
+        fn_arr = _malloc_ptr_array("struct flintdb_aggregate_func *", [f._f for f in funcs])
 
-        for i, gb in enumerate(groupbys):
-            gb_arr[i] = gb._gb
-            gb._owned = False  # ownership transferred to Aggregate
-
-        for i, f in enumerate(funcs):
-            fn_arr[i] = f._f
-            f._owned = False  # ownership transferred to Aggregate
+        for gb in groupbys:
+            if gb._finalizer is not None:
+                gb._finalizer.detach()  # ownership transferred to Aggregate
+        for f in funcs:
+            if f._finalizer is not None:
+                f._finalizer.detach()  # ownership transferred to Aggregate
 
         agg = _lib.aggregate_new(_to_cstr(agg_id), gb_arr, gb_count, fn_arr, fn_count, err)
         _raise_if_err(err)
-        if agg == ffi.NULL:
+        if agg == _NULL:
             raise FlintDBError("aggregate_new returned NULL")
         return Aggregate(agg)
 
     def row(self, r: Union[Row, "ffi.CData"]) -> None:
+        try:
+            ptr = r._r
+        except AttributeError:
+            ptr = r
         err = _err_ptr()
-        ptr = r._ptr() if isinstance(r, Row) else r
         self._agg.row(self._agg, ptr, err)
         _raise_if_err(err)
 
+    def row_many(self, rows: Iterable[Union[Row, "ffi.CData"]]) -> None:
+        agg = self._agg
+        agg_row = agg.row
+        # Own error slot, as `rows` may be a generator making FlintDB calls.
+        err = ffi.new("char **")
+        for r in rows:
+            try:
+                ptr = r._r
+            except AttributeError:
+                ptr = r
+            agg_row(agg, ptr, err)
+            if err[0] != _NULL:
+                _raise_if_err(err)
+
+    def ingest_cursor(self, cursor: Union[CursorI64, CursorRow], table: Optional["Table"] = None) -> int:
+        """Feed every row the cursor yields to the aggregate inside one C call.
+
+        A CursorI64 yields rowids, so the rows are read from table, which
+        defaults to the Table the cursor came from (Table.find). Returns the
+        number of rows aggregated.
+        """
+        if cursor._c == _NULL:
+            raise FlintDBError("cursor is closed")
+        err = _err_ptr()
+        if isinstance(cursor, CursorRow):
+            n = _lib.flintdb_py_aggregate_ingest_rows(self._agg, cursor._c, err)
+        else:
+            if table is None:
+                table = cursor._parent
+            if not isinstance(table, Table):
+                raise FlintDBError("ingest_cursor needs the Table the rowid cursor reads from")
+            ids, nids, c = cursor._drain_args()
+            n = _lib.flintdb_py_aggregate_ingest(self._agg, table._live(), ids, nids, c, err)
+        _raise_if_err(err)
+        return int(n)
+
     def compute(self) -> List[Row]:
         err = _err_ptr()
         out = ffi.new("struct flintdb_row ***")
         n = self._agg.compute(self._agg, out, err)
         _raise_if_err(err)
-        if n <= 0 or out[0] == ffi.NULL:
+        if n <= 0 or out[0] == _NULL:
             return []
         rows = out[0]
         result: List[Row] = []
         for i in range(int(n)):
-            if rows[i] != ffi.NULL:
-                result.append(Row.owned(rows[i]))
+            if rows[i] != _NULL:
+                result.append(Row.owned(rows[i], self))
         # Best-effort free for the array returned by CALLOC.
-        _libc.free(rows)
+        _lib.free(rows)
         return result
 
+    def compute_as_ndarray(self, columns: Sequence[int]):
+        """Compute and return the given numeric result columns as an (n, k) float64 NumPy array.
+
+        The matrix is filled in one C call (DECIMAL converted, NULL -> NaN) and the
+        result rows are freed, so it can go straight to vectorized / numba @njit code.
+        """
+        import numpy as np
+
+        err = _err_ptr()
+        out = ffi.new("struct flintdb_row ***")
+        n = self._agg.compute(self._agg, out, err)
+        _raise_if_err(err)
+        k = len(columns)
+        if n <= 0 or out[0] == _NULL:
+            return np.empty((0, k), dtype=np.float64)
+        rows = out[0]
+        try:
+            arr = np.empty((n, k), dtype=np.float64)
+            cols = ffi.new("int[]", list(columns))
+            rc = _lib.flintdb_py_rows_to_f64(rows, n, cols, k, ffi.from_buffer("f64[]", arr), err)
+            _raise_if_err(err)
+            if rc < 0:
+                raise FlintDBError("rows_to_f64 failed")
+        finally:
+            _lib.flintdb_py_rows_free(rows, n)
+        return arr
+
     def close(self) -> None:
-        if getattr(self, "_agg", ffi.NULL) != ffi.NULL:
-            self._agg.free(self._agg)
-            self._agg = ffi.NULL
+        if self._finalizer is not None:
+            self._finalizer()
+        self._agg = _NULL
 
     def __enter__(self) -> "Aggregate":
         return self
@@ -826,33 +1533,124 @@ class Aggregate:
         self.close()
 
 
+def _make_row_class(meta: Meta) -> type:
+    stem = os.path.splitext(os.path.basename(meta._path.decode("utf-8", "replace")))[0]
+    cls_name = "_Row_" + "".join(c if c.isalnum() else "_" for c in stem)
+
+    src = [f"class {cls_name}(Row):"]
+    for i, (t, name) in enumerate(zip(_column_types(meta._m), _column_names(meta._m))):
+        if not name.isidentifier() or keyword.iskeyword(name) or name.startswith("_"):
+            continue  # still reachable through Row.set(idx, ...)
+        # Never override Row's own accessors (a column named `string` must not
+        # replace get_string/set_string, which every other accessor relies on).
+        gen_get = not hasattr(Row, f"get_{name}")
+        gen_set = not hasattr(Row, f"set_{name}")
+        getter = None
+        if gen_get:
+            if t == _lib.VARIANT_STRING:
+                src.append(f"    def get_{name}(self): return self.get_string({i})")
+                getter = f"get_{name}"
+            elif t == _lib.VARIANT_BYTES:
+                src.append(f"    def get_{name}(self): return self.get_bytes({i})")
+                getter = f"get_{name}"
+            elif t in _GET_CODE_BY_TYPE:
+                src += [
+                    f"    def get_{name}(self):",
+                    "        r = self._r",
+                    "        err = _err_ptr()",
+                    f"        v = r.{_GET_CODE_BY_TYPE[t]}(r, {i}, err)",
+                    "        if err[0] != NULL: _raise_if_err(err)",
+                    "        return v",
+                ]
+                getter = f"get_{name}"
+        setter = None
+        if gen_set and t in _SET_CODE_BY_TYPE:
+            fn, args = _SET_CODE_BY_TYPE[t]
+            src += [
+                f"    def set_{name}(self, v):",
+                "        r = self._r",
+                "        err = _err_ptr()",
+                f"        r.{fn}(r, {i}, {args}, err)",
+                "        if err[0] != NULL: _raise_if_err(err)",
+            ]
+            setter = f"set_{name}"
+        if (getter or setter) and not hasattr(Row, name):
+            src.append(f"    {name} = property({getter}, {setter})")
+    src.append("    pass")
+
+    ns = {"Row": Row, "NULL": _NULL, "_err_ptr": _err_ptr, "_raise_if_err": _raise_if_err, "_enc_value": _enc_value}
+    exec("\n".join(src), ns)
+    return ns[cls_name]
+
+
+class RowPool:
+    """A small ring of reusable rows for one schema.
+
+    acquire() returns the next row, reset to the schema defaults. It is
+    borrowed from the pool, so leaving its `with` block does not free it; the
+    rows themselves are freed by close().
+    """
+
+    def __init__(self, meta: Meta, size: int = 1):
+        self._meta = meta
+        self._setters = meta._column_setters()
+        self._validator = meta._validator
+        self._rows = [Row(meta) for _ in range(max(size, 1))]
+        self._next = 0
+
+    def acquire(self) -> Row:
+        row = self._rows[self._next]
+        self._next = (self._next + 1) % len(self._rows)
+        row.reset()
+        view = Row.borrowed(row._r, row)
+        view._setters = self._setters
+        view._validator = self._validator
+        return view
+
+    def close(self) -> None:
+        for row in self._rows:
+            row.close()
+        self._rows = []
+
+    def __enter__(self) -> "RowPool":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
 class SqlResult:
+    _finalizer = None
+
     def __init__(self, ptr):
         self._res = ptr
+        self._finalizer = _autoclose(self, ptr.close, ptr)
 
     @property
     def affected(self) -> int:
         return int(self._res.affected)
 
-    @property
+    @functools.cached_property
     def column_names(self) -> List[str]:
+        # Names are fixed for the lifetime of a result; decode them once.
         names: List[str] = []
         for i in range(int(self._res.column_count)):
             p = self._res.column_names[i]
-            if p != ffi.NULL:
+            if p != _NULL:
                 names.append(ffi.string(p).decode("utf-8", "replace"))
         return names
 
     def iter_rows(self) -> Iterable[Row]:
         c = self._res.row_cursor
-        if c == ffi.NULL:
+        if c == _NULL:
             return []
-        return CursorRow(c)
+        # The result owns its cursor and closes it in close().
+        return CursorRow(c, self, owned=False)
 
     def close(self) -> None:
-        if getattr(self, "_res", ffi.NULL) != ffi.NULL:
-            self._res.close(self._res)
-            self._res = ffi.NULL
+        if self._finalizer is not None:
+            self._finalizer()
+        self._res = _NULL
 
     def __enter__(self) -> "SqlResult":
         return self
@@ -863,22 +1661,135 @@ class SqlResult:
 
 def sql_exec(sql: str) -> SqlResult:
     err = _err_ptr()
-    res = _lib.flintdb_sql_exec(_to_cstr(sql), ffi.NULL, err)
+    res = _lib.flintdb_sql_exec(_to_cstr(sql), _NULL, err)
     _raise_if_err(err)
-    if res == ffi.NULL:
+    if res == _NULL:
         raise FlintDBError("sql_exec returned NULL")
     return SqlResult(res)
 
 
+def _split_placeholders(sql: str) -> List[str]:
+    # Split at each `?` that is not inside a '...' or `...` literal.
+    parts: List[str] = []
+    start = 0
+    quote = None
+    prev = ""
+    for i, ch in enumerate(sql):
+        if quote:
+            if ch == quote and prev != "\\":
+                quote = None
+        elif ch in "'`":
+            quote = ch
+        elif ch == "?":
+            parts.append(sql[start:i])
+            start = i + 1
+        prev = ch
+    parts.append(sql[start:])
+    return parts
+
+
+def _sql_literal(v) -> str:
+    if v is None:
+        return "NULL"
+    if isinstance(v, bool):
+        return "1" if v else "0"
+    if isinstance(v, int):
+        return repr(v)
+    if isinstance(v, float):
+        if not math.isfinite(v):
+            raise FlintDBError(f"SqlStatement: cannot bind non-finite float {v!r}")
+        return repr(v)
+    s = v.decode() if isinstance(v, bytes) else str(v)
+    # libflintdb has no escape that works everywhere: INSERT unescapes \' but
+    # WHERE compares the raw text, so such a value would silently match
+    # nothing. Refuse it rather than bind something else.
+    if "'" in s or "\\" in s:
+        raise FlintDBError(f"SqlStatement: cannot bind string containing a quote or backslash: {s!r}")
+    return "'" + s + "'"
+
+
+class SqlStatement:
+    """A SQL template with `?` placeholders, split once and bound per execution.
+
+    libflintdb has no prepared statements, so each exec() still runs the full
+    statement through flintdb_sql_exec; what is reused is the split template,
+    and values are quoted for you instead of being formatted into the SQL.
+    Strings containing `'` or `\\` and non-finite floats cannot be expressed
+    as literals libflintdb reads back unchanged, so binding them raises
+    FlintDBError.
+    """
+
+    def __init__(self, sql: str):
+        self._parts = _split_placeholders(sql)
+
+    @property
+    def param_count(self) -> int:
+        return len(self._parts) - 1
+
+    def exec(self, params: Sequence = ()) -> SqlResult:
+        parts = self._parts
+        if len(params) != len(parts) - 1:
+            raise FlintDBError(f"SqlStatement: expected {len(parts) - 1} parameters, got {len(params)}")
+        sql = [parts[0]]
+        for v, part in zip(params, parts[1:]):
+            sql.append(_sql_literal(v))
+            sql.append(part)
+        return sql_exec("".join(sql))
+
+    def exec_many(self, rows: Iterable[Sequence]) -> int:
+        """Execute once per parameter tuple; returns the total affected rows."""
+        affected = 0
+        for params in rows:
+            with self.exec(params) as res:
+                affected += res.affected
+        return affected
+
+
+def sql_prepare(sql: str) -> SqlStatement:
+    return SqlStatement(sql)
+
+
+def sql_bind_exec(stmt: SqlStatement, params: Sequence = ()) -> SqlResult:
+    return stmt.exec(params)
+
+
+def run_concurrently(calls: Iterable[Callable[[], object]], max_workers: Optional[int] = None) -> List[object]:
+    """Run independent zero-argument callables on a thread pool; results come back in order.
+
+    cffi releases the GIL around every libflintdb call (`_lib` functions and
+    the vtable function pointers alike), so work on separate tables and files
+    overlaps in C. Calls must not share a Table, cursor or Row; the first
+    exception raised is re-raised here.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    calls = list(calls)
+    with ThreadPoolExecutor(max_workers=max_workers or max(len(calls), 1)) as pool:
+        return list(pool.map(lambda call: call(), calls))
+
+
 def print_row(r: Union[Row, "ffi.CData"]) -> None:
     ptr = r._ptr() if isinstance(r, Row) else r
     _lib.flintdb_print_row(ptr)
 
 
+def print_rows(rows: Iterable[Union[Row, "ffi.CData"]]) -> int:
+    """Print several rows with one C call and a single flush of stdout.
+
+    The rows must all be valid at once (owned rows, e.g. from FileSort.read()
+    or Aggregate.compute()); to print a table scan use Table.print_rows().
+    """
+    ptrs = [r._ptr() if isinstance(r, Row) else r for r in rows]
+    if ptrs:
+        sys.stdout.flush()
+        _lib.flintdb_py_print_rows(ffi.new("struct flintdb_row *[]", ptrs), len(ptrs))
+    return len(ptrs)
+
+
 def cleanup() -> None:
     """Cleanup all FlintDB resources"""
     err = _err_ptr()
     _lib.flintdb_cleanup(err)
     # Ignore errors during cleanup
-    if err[0] != ffi.NULL:
+    if err[0] != _NULL:
         pass
@@ -6,4 +6,12 @@ if [[ -f "./venv/bin/activate" ]]; then
 	source "./venv/bin/activate"
 fi
 
-python3 tutorial.py
\ No newline at end of file
+# The _flintdb extension is compiled ahead of time (cffi API mode); rebuild it
+# only when it is missing or older than its build script or libflintdb.
+ext=$(ls _flintdb.*.so 2>/dev/null | head -n 1 || true)
+lib=$(ls ../../lib/libflintdb.so ../../lib/libflintdb.dylib 2>/dev/null | head -n 1 || true)
+if [[ -z "$ext" || flintdb_build.py -nt "$ext" || ( -n "$lib" && "$lib" -nt "$ext" ) ]]; then
+	python3 flintdb_build.py
+fi
+
+python3 tutorial.py
@@ -0,0 +1,349 @@
+"""Tests for the flintdb_cffi wrapper.
+
+Build the extension first (`python3 flintdb_build.py`), then run
+`python3 -m pytest -q` from this directory.
+"""
+
+import math
+import operator
+from array import array
+
+import pytest
+
+pytest.importorskip("_flintdb", reason="build the extension with `python3 flintdb_build.py`")
+
+from flintdb_cffi import (  # noqa: E402
+    Aggregate, Column, FileSort, FlintDBError, Meta, Row, RowPool, SqlStatement, Table,
+    FLINTDB_RDWR, SPEC_NOT_NULL, VARIANT_DOUBLE, VARIANT_INT32, VARIANT_INT64, VARIANT_STRING,
+    func_count, func_sum, groupby_new, sql_exec, sql_prepare,
+)
+
+N = 300
+
+
+def customer_meta(path):
+    return Meta.from_schema(path, [
+        Column("id", VARIANT_INT64, spec=SPEC_NOT_NULL, default="0"),
+        Column("name", VARIANT_STRING, size=50, spec=SPEC_NOT_NULL, default=""),
+        Column("age", VARIANT_INT32, spec=SPEC_NOT_NULL, default="0"),
+    ], indexes=[("primary", None, ["id"])])
+
+
+def sort_meta(path):
+    return Meta.from_schema(path, [
+        Column("value", VARIANT_INT32, spec=SPEC_NOT_NULL, default="0"),
+        Column("label", VARIANT_STRING, size=20, spec=SPEC_NOT_NULL, default=""),
+    ])
+
+
+@pytest.fixture(autouse=True)
+def workdir(tmp_path, monkeypatch):
+    # libflintdb caps the table path at 63 bytes; use short relative paths.
+    monkeypatch.chdir(tmp_path)
+
+
+@pytest.fixture
+def meta():
+    with customer_meta("./customer.flintdb") as mt:
+        yield mt
+
+
+@pytest.fixture
+def table(meta):
+    with Table("./customer.flintdb", FLINTDB_RDWR, meta) as tbl:
+        tbl.apply_values(meta, [(i, f"c{i}", 20 + i % 50) for i in range(N)])
+        yield tbl
+
+
+@pytest.fixture
+def filesort():
+    with sort_meta("./sort.dat") as mt, FileSort("./sort.dat", mt) as fs:
+        values = array("i", [5, 2, 8, 1, 9, 3, 2])
+        assert fs.add_columns([values, [f"item-{v}" for v in values]]) == len(values)
+        yield fs
+
+
+def sorted_values(fs):
+    out = []
+    for i in range(fs.rows()):
+        with fs.read(i) as r:
+            out.append(r.get_i32(0))
+    return out
+
+
+# Table inserts
+
+
+def test_apply_values_and_rows(table):
+    assert table.rows() == N
+    assert table.read(table.find_first("WHERE id = 7")).get_string(1) == "c7"
+
+
+@pytest.mark.parametrize("bad", [(1, None, 1), (None, "x", 1), (1, "x", "y"), (1, "x", 2 ** 40)])
+def test_apply_values_rejects_bad_values(table, meta, bad):
+    with pytest.raises(FlintDBError):
+        table.apply_values(meta, [(N, "ok", 1), bad])
+    assert table.rows() == N
+
+
+def test_apply_values_wrong_arity(table, meta):
+    with pytest.raises(FlintDBError, match="expected 3 values"):
+        table.apply_values(meta, [(1, "x")])
+
+
+def test_apply_many(table, meta):
+    rows = []
+    for i in range(3):
+        r = Row(meta)
+        r.set(0, N + i)
+        r.set(1, f"m{i}")
+        r.set(2, 1)
+        rows.append(r)
+    rowids = table.apply_many(rows)
+    assert len(rowids) == 3
+    assert [table.read(rid).get_string(1) for rid in rowids] == ["m0", "m1", "m2"]
+    for r in rows:
+        r.close()
+
+
+def test_apply_columns(meta):
+    with Table("./customer.flintdb", FLINTDB_RDWR, meta) as tbl:
+        n = tbl.apply_columns(meta, [array("q", [1, 2, 3]), ["a", b"b", "c"], [30, 31, 32]])
+        assert n == 3
+        assert tbl.read(tbl.find_first("WHERE id = 2")).get_string(1) == "b"
+
+
+def test_apply_columns_rejects_bad_input(meta):
+    with Table("./customer.flintdb", FLINTDB_RDWR, meta) as tbl:
+        with pytest.raises(FlintDBError, match="column 1"):
+            tbl.apply_columns(meta, [[1, 2], ["a", None], [1, 2]])
+        with pytest.raises(FlintDBError, match="has 1 values"):
+            tbl.apply_columns(meta, [[1, 2], ["a"], [1, 2]])
+        assert tbl.rows() == 0
+
+
+# Row
+
+
+def test_row_set_errors(meta):
+    with Row(meta) as r:
+        for idx, value in ((5, 1), (-1, 1), (0, 1.5), (1, None)):
+            with pytest.raises(FlintDBError):
+                r.set(idx, value)
+        r.set(1, "ok")
+        assert r.get_string(1) == "ok"
+
+
+def test_row_as_array(meta):
+    pytest.importorskip("numpy")
+    with Row(meta) as r:
+        r.set(0, 42)
+        r.set(2, 7)
+        arr = r.as_array()
+        assert arr["i"][0] == 42 and arr["i"][2] == 7
+        assert not arr.flags.writeable
+
+
+def test_make_row_class(meta):
+    cls = meta.make_row_class()
+    assert cls is meta.make_row_class()
+    with cls(meta) as r:
+        r.id = 5
+        r.name = "five"
+        assert r.id == 5 and r.get_name() == "five"
+        # Row's own accessors are never replaced by generated ones
+        assert cls.get_string is Row.get_string
+
+
+def test_row_pool(meta):
+    with RowPool(meta) as pool:
+        with pool.acquire() as r:
+            r.set(0, 7)
+            r.set(1, "first")
+        with pool.acquire() as r:
+            # the same row, reset: id back to its default, name (no default) NULL
+            assert r.get_i32(0) == 0
+            assert r.get_string(1) is None
+
+
+def test_freeze():
+    with Meta.from_schema("./f.flintdb", [
+        Column("id", VARIANT_INT64, spec=SPEC_NOT_NULL),
+        Column("name", VARIANT_STRING, size=50, spec=SPEC_NOT_NULL),
+    ]) as mt:
+        assert mt.freeze(["id"]).required == frozenset({1})
+        assert mt.freeze(["id", "name"]).trivial
+        for bad in (["nope"], [5], [-1]):
+            with pytest.raises(FlintDBError, match="unknown column"):
+                mt.freeze(bad)
+        mt.freeze()
+        with Row(mt) as r:
+            assert not r.validate()
+
+
+# Cursors
+
+
+def test_fetch_batch_and_iteration(table):
+    with table.find() as c:
+        first = c.fetch_batch(10)
+        assert len(first) == 10
+        it = iter(c)
+        next(it)
+        # what iteration read ahead is still there for next()
+        assert c.next() >= 0
+        rest = list(it)
+        assert len(first) + 2 + len(rest) == N
+        assert c.fetch_batch() == [] and c.next() == -1
+
+
+def test_length_hint_tracks_consumption(table):
+    with table.find() as c:
+        assert operator.length_hint(c) == N
+        c.next()
+        c.fetch_batch(9)
+        assert operator.length_hint(c) == N - 10
+        it = iter(c)
+        next(it)
+        assert operator.length_hint(c) == N - 11
+        assert len(list(it)) == N - 11
+        assert operator.length_hint(c) == 0
+
+
+def test_find_first(table):
+    assert table.find_first("WHERE id = 12") >= 0
+    assert table.find_first("WHERE id = 100000") == -1
+    assert table.find_first("WHERE id >= 3 LIMIT 5") >= 0
+
+
+def test_print_rows(table, capfd):
+    with table.find("WHERE id < 3") as c:
+        assert table.print_rows(c) == 3
+    assert "c2" in capfd.readouterr().out
+
+
+# Use after close
+
+
+def test_closed_table_raises(meta):
+    tbl = Table("./customer.flintdb", FLINTDB_RDWR, meta)
+    tbl.apply_values(meta, [(1, "a", 1)])
+    tbl.close()
+    with Row(meta) as r:
+        with pytest.raises(FlintDBError, match="closed"):
+            tbl.apply(r)
+    for call in (lambda: tbl.read(0), tbl.rows, tbl.find, lambda: tbl.find_first("WHERE id = 1")):
+        with pytest.raises(FlintDBError, match="closed"):
+            call()
+
+
+def test_closed_cursor_raises(table):
+    c = table.find()
+    it = iter(c)
+    next(it)
+    c.close()
+    with Aggregate.build("n", [], [func_count("*", "n", VARIANT_INT64)]) as agg:
+        for call in (c.next, c.fetch_batch, lambda: list(it), lambda: list(c),
+                     lambda: table.print_rows(c), lambda: agg.ingest_cursor(c)):
+            with pytest.raises(FlintDBError, match="closed"):
+                call()
+    assert operator.length_hint(c) == 0
+
+
+def test_closed_row_raises(meta):
+    r = Row(meta)
+    r.set_i64(0, 1)
+    r.close()
+    for call in (lambda: r.set_i64(0, 1), lambda: r.set(0, 1), lambda: r.get_i32(2)):
+        with pytest.raises(FlintDBError, match="closed"):
+            call()
+
+
+# FileSort
+
+
+def test_sort_by(filesort):
+    filesort.sort_by(0)
+    assert sorted_values(filesort) == [1, 2, 2, 3, 5, 8, 9]
+    filesort.sort_by(0, descending=True)
+    assert sorted_values(filesort) == [9, 8, 5, 3, 2, 2, 1]
+    with pytest.raises(FlintDBError, match="not numeric"):
+        filesort.sort_by(1)
+
+
+def test_sort_with_row_comparator(filesort):
+    filesort.sort(lambda ctx, a, b: a.get_i32(0) - b.get_i32(0))
+    assert sorted_values(filesort) == [1, 2, 2, 3, 5, 8, 9]
+
+
+def test_sort_compare_raw(filesort):
+    def desc(ctx, a, b):
+        return b.array[0].value.i - a.array[0].value.i
+
+    filesort.sort(desc, compare_raw=True)
+    assert sorted_values(filesort) == [9, 8, 5, 3, 2, 2, 1]
+
+
+def test_argsort(filesort):
+    pytest.importorskip("numpy")
+    assert list(filesort.argsort(0)) == [3, 1, 6, 5, 0, 2, 4]
+    # stable descending: equal keys keep insertion order
+    assert list(filesort.argsort(0, descending=True)) == [4, 2, 0, 5, 1, 6, 3]
+    with pytest.raises(FlintDBError, match="not numeric"):
+        filesort.argsort(1)
+
+
+# Aggregate
+
+
+def test_aggregate_compute_as_ndarray(table):
+    np = pytest.importorskip("numpy")
+    groupbys = [groupby_new("age", "age", VARIANT_INT32)]
+    funcs = [func_count("*", "count", VARIANT_INT64), func_sum("id", "total", VARIANT_DOUBLE)]
+    with Aggregate.build("by_age", groupbys, funcs) as agg:
+        with table.find() as c:
+            assert agg.ingest_cursor(c) == N
+        arr = agg.compute_as_ndarray([1, 2])
+    assert arr.shape == (50, 2)
+    assert arr[:, 0].sum() == N
+    assert arr[:, 1].sum() == sum(range(N))
+    assert not np.isnan(arr).any()
+
+
+# SQL binding
+
+
+@pytest.fixture
+def employees():
+    path = "./employees.flintdb"
+    with Meta.from_schema(path, [
+        Column("id", VARIANT_INT64, spec=SPEC_NOT_NULL, default="0"),
+        Column("name", VARIANT_STRING, size=50, spec=SPEC_NOT_NULL),
+        Column("salary", VARIANT_DOUBLE, spec=SPEC_NOT_NULL, default="0.0"),
+    ], indexes=[("primary", None, ["id"])]) as mt:
+        with Table(path, FLINTDB_RDWR, mt):
+            pass
+    return path
+
+
+def test_sql_statement_round_trip(employees):
+    insert = sql_prepare(f"INSERT INTO {employees} VALUES (?, ?, ?)")
+    assert insert.param_count == 3
+    assert insert.exec_many([(1, "Alice", 75000.0), (2, "Bob", 65000.0)]) == 2
+    select = SqlStatement(f"SELECT * FROM {employees} WHERE name = ?")
+    with select.exec(("Bob",)) as res:
+        rows = list(res.iter_rows())
+        assert len(rows) == 1 and rows[0].get_string(1) == "Bob"
+    with sql_exec(f"SELECT * FROM {employees}") as res:
+        assert res.column_names == ["id", "name", "salary"]
+
+
+@pytest.mark.parametrize("value", ["O'Brien", "back\\slash", b"x'y", math.inf, math.nan])
+def test_sql_statement_rejects_unbindable_values(employees, value):
+    with pytest.raises(FlintDBError, match="cannot bind"):
+        sql_prepare(f"SELECT * FROM {employees} WHERE name = ?").exec((value,))
+
+
+def test_sql_statement_param_count(employees):
+    with pytest.raises(FlintDBError, match="expected 2 parameters"):
+        SqlStatement(f"SELECT * FROM {employees} WHERE id = ? AND name = ?").exec((1,))
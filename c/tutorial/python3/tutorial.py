@@ -8,10 +8,11 @@
 import atexit
 import os
 import sys
+from array import array
 from flintdb_cffi import (
-    Meta, Table, Row, GenericFile, CursorI64, CursorRow,
+    Meta, Column, Table, RowPool, GenericFile,
     FileSort, Aggregate, groupby_new, func_count, func_sum, func_avg,
-    FlintDBError, print_row, sql_exec, cleanup,
+    FlintDBError, print_row, print_rows, run_concurrently, sql_exec, sql_prepare, sql_bind_exec, cleanup,
     FLINTDB_RDONLY, FLINTDB_RDWR,
     VARIANT_INT32, VARIANT_INT64, VARIANT_DOUBLE, VARIANT_STRING, VARIANT_DECIMAL,
     SPEC_NOT_NULL, PRIMARY_NAME
@@ -37,32 +38,25 @@ def tutorial_table_create():
     
     try:
         # 1. Define the table schema (meta-information)
-        with Meta(tablename) as mt:
-            mt.add_column("id", VARIANT_INT64, spec=SPEC_NOT_NULL, default="0", comment="PRIMARY KEY")
-            mt.add_column("name", VARIANT_STRING, size=50, spec=SPEC_NOT_NULL, default="", comment="Customer name")
-            mt.add_column("age", VARIANT_INT32, spec=SPEC_NOT_NULL, default="0", comment="Customer age")
-            
-            # Add indexes
-            mt.add_index(PRIMARY_NAME.decode(), None, ["id"])
-            mt.add_index("ix_age", None, ["age"])
-            
+        #    Columns and indexes are declared together and built in one call.
+        with Meta.from_schema(tablename, [
+            Column("id", VARIANT_INT64, spec=SPEC_NOT_NULL, default="0", comment="PRIMARY KEY"),
+            Column("name", VARIANT_STRING, size=50, spec=SPEC_NOT_NULL, default="", comment="Customer name"),
+            Column("age", VARIANT_INT32, spec=SPEC_NOT_NULL, default="0", comment="Customer age"),
+        ], indexes=[
+            (PRIMARY_NAME.decode(), None, ["id"]),
+            ("ix_age", None, ["age"]),
+        ]) as mt:
             # Print schema SQL
             print(f"Table schema SQL:\n{mt.to_sql_string()}\n")
             
             # 2. Open the table with the defined schema
             with Table(tablename, FLINTDB_RDWR, mt) as tbl:
-                # 3. Insert data rows
+                # 3. Insert data rows (one tuple per row, in column order;
+                #    apply_values reuses its rows and applies them in batches)
                 print("Inserting 3 rows...")
-                for i in range(3):
-                    with Row(mt) as row:
-                        row.set_i64(0, i + 1)
-                        row.set_string(1, f"Customer {i + 1}")
-                        row.set_i32(2, 30 + i)
-                        
-                        if not row.validate():
-                            raise FlintDBError("Row validation failed")
-                        
-                        tbl.apply(row, check_dup=False)
+                customers = [(i + 1, f"Customer {i + 1}", 30 + i) for i in range(3)]
+                tbl.apply_values(mt, customers, check_dup=False)
         
         print("Successfully created table and inserted data.\n")
         return 0
@@ -84,10 +78,8 @@ def tutorial_table_find():
             # 2. Find data using a WHERE clause
             print("Finding rows where age >= 31:")
             with tbl.find("WHERE age >= 31") as cursor:
-                # 3. Iterate through the cursor
-                for rowid in cursor:
-                    row = tbl.read(rowid)
-                    print_row(row)
+                # 3. Read and print every matching row (one C call for the scan)
+                tbl.print_rows(cursor)
         
         print("\nSuccessfully found and read data.\n")
         return 0
@@ -106,20 +98,22 @@ def tutorial_tsv_create():
     
     try:
         # 1. Define the schema for the TSV file
-        with Meta(filepath) as mt:
-            mt.add_column("product_id", VARIANT_INT32, spec=SPEC_NOT_NULL)
-            mt.add_column("product_name", VARIANT_STRING, size=100, spec=SPEC_NOT_NULL)
-            mt.add_column("price", VARIANT_DOUBLE, spec=SPEC_NOT_NULL)
-            
+        with Meta.from_schema(filepath, [
+            Column("product_id", VARIANT_INT32, spec=SPEC_NOT_NULL),
+            Column("product_name", VARIANT_STRING, size=100, spec=SPEC_NOT_NULL),
+            Column("price", VARIANT_DOUBLE, spec=SPEC_NOT_NULL),
+        ]) as mt:
             # 2. Open the generic file with TSV format
-            with GenericFile(filepath, FLINTDB_RDWR, mt) as gf:
-                # 3. Write data rows
+            with GenericFile(filepath, FLINTDB_RDWR, mt) as gf, RowPool(mt) as pool:
+                # 3. Write data rows (pooled: one row is reset and reused)
                 print("Writing 3 rows to TSV...")
+                # Look the column indexes up once, not per row
+                pid_ix, pname_ix, price_ix = (mt.column_at(c) for c in ("product_id", "product_name", "price"))
                 for i in range(3):
-                    with Row(mt) as row:
-                        row.set_i32(mt.column_at("product_id"), 101 + i)
-                        row.set_string(mt.column_at("product_name"), f"Product-{chr(ord('A') + i)}")
-                        row.set_f64(mt.column_at("price"), 9.99 * (i + 1))
+                    with pool.acquire() as row:
+                        row.set_i32(pid_ix, 101 + i)
+                        row.set_string(pname_ix, f"Product-{chr(ord('A') + i)}")
+                        row.set_f64(price_ix, 9.99 * (i + 1))
                         gf.write(row)
         
         print("Successfully created TSV file.\n")
@@ -164,31 +158,28 @@ def tutorial_table_update_delete():
         with Table(tablename, FLINTDB_RDWR) as tbl:
             # Find and update a row
             print("Finding and updating Customer with age = 30:")
-            with tbl.find("WHERE age = 30") as cursor:
-                rowid = cursor.next()
-                if rowid > -1:
-                    old_row = tbl.read(rowid)
-                    print("Before update:")
-                    print_row(old_row)
-                    
-                    # Create updated row (Note: This is simplified - full implementation needs to copy old values)
-                    print("Note: Full update requires reading old values and creating new row")
-                    print("See C/C++ tutorials for complete implementation.\n")
+            # find_first opens, steps and closes its cursor in a single call
+            rowid = tbl.find_first("WHERE age = 30")
+            if rowid > -1:
+                old_row = tbl.read(rowid)
+                print("Before update:")
+                print_row(old_row)
+                
+                # Create updated row (Note: This is simplified - full implementation needs to copy old values)
+                print("Note: Full update requires reading old values and creating new row")
+                print("See C/C++ tutorials for complete implementation.\n")
             
             # Delete a row
             print("Deleting Customer with id = 3:")
-            with tbl.find("WHERE id = 3") as cursor:
-                rowid = cursor.next()
-                if rowid > -1:
-                    tbl.delete_at(rowid)
-                    print(f"Successfully deleted row at rowid {rowid}\n")
+            rowid = tbl.find_first("WHERE id = 3")
+            if rowid > -1:
+                tbl.delete_at(rowid)
+                print(f"Successfully deleted row at rowid {rowid}\n")
             
             # Show remaining rows
             print("Remaining customers:")
             with tbl.find("") as cursor:
-                for rowid in cursor:
-                    row = tbl.read(rowid)
-                    print_row(row)
+                tbl.print_rows(cursor)
         
         print("\nSuccessfully updated and deleted rows.\n")
         return 0
@@ -211,30 +202,26 @@ def tutorial_filesort():
             pass
 
     try:
-        with Meta(filepath) as mt:
-            mt.add_column("value", VARIANT_INT32, spec=SPEC_NOT_NULL, default="0", comment="Sort value")
-            mt.add_column("label", VARIANT_STRING, size=20, spec=SPEC_NOT_NULL, default="", comment="Label")
-
+        with Meta.from_schema(filepath, [
+            Column("value", VARIANT_INT32, spec=SPEC_NOT_NULL, default="0", comment="Sort value"),
+            Column("label", VARIANT_STRING, size=20, spec=SPEC_NOT_NULL, default="", comment="Label"),
+        ]) as mt:
             with FileSort(filepath, mt) as fs:
                 print("Adding unsorted rows...")
-                values = [5, 2, 8, 1, 9, 3]
-                for v in values:
-                    with Row(mt) as r:
-                        r.set_i32(0, v)
-                        r.set_string(1, f"Item-{v}")
-                        fs.add(r)
-
-                def compare_by_value(_ctx, a, b):
-                    # Match tutorial.c: compare integer value at column 0
-                    return int(a.get_i32(0) - b.get_i32(0))
+                # Column-wise: an int32 buffer plus the labels, added in one C call
+                values = array("i", [5, 2, 8, 1, 9, 3])
+                fs.add_columns([values, [f"Item-{v}" for v in values]])
 
-                fs.sort(compare_by_value)
+                # Match tutorial.c: compare integer value at column 0. sort_by uses
+                # a C comparator; fs.sort(compare) takes any Python comparator.
+                fs.sort_by(0)
 
                 print("Reading sorted rows:")
                 count = fs.rows()
-                for i in range(count):
-                    with fs.read(i) as r:
-                        print_row(r)
+                rows = [fs.read(i) for i in range(count)]
+                print_rows(rows)
+                for r in rows:
+                    r.close()
 
         print(f"\nSuccessfully sorted {count} rows.\n")
         return 0
@@ -252,30 +239,22 @@ def tutorial_aggregate():
     Table.drop(tablename)
 
     try:
-        with Meta(tablename) as mt:
-            mt.add_column("product", VARIANT_STRING, size=20, spec=SPEC_NOT_NULL, default="", comment="Product name")
-            mt.add_column("category", VARIANT_STRING, size=20, spec=SPEC_NOT_NULL, default="", comment="Category")
-            mt.add_column("quantity", VARIANT_INT32, spec=SPEC_NOT_NULL, default="0", comment="Quantity sold")
-            mt.add_column("price", VARIANT_DOUBLE, spec=SPEC_NOT_NULL, default="0.0", comment="Unit price")
-            mt.add_index(PRIMARY_NAME.decode(), None, ["product"])
-
+        with Meta.from_schema(tablename, [
+            Column("product", VARIANT_STRING, size=20, spec=SPEC_NOT_NULL, default="", comment="Product name"),
+            Column("category", VARIANT_STRING, size=20, spec=SPEC_NOT_NULL, default="", comment="Category"),
+            Column("quantity", VARIANT_INT32, spec=SPEC_NOT_NULL, default="0", comment="Quantity sold"),
+            Column("price", VARIANT_DOUBLE, spec=SPEC_NOT_NULL, default="0.0", comment="Unit price"),
+        ], indexes=[(PRIMARY_NAME.decode(), None, ["product"])]) as mt:
             with Table(tablename, FLINTDB_RDWR, mt) as tbl:
                 print("Inserting sales data...")
-                sales = [
-                    ("Apple", "Fruit", 10, 1.50),
-                    ("Banana", "Fruit", 15, 0.80),
-                    ("Carrot", "Vegetable", 8, 1.20),
-                    ("Tomato", "Vegetable", 12, 2.00),
-                    ("Orange", "Fruit", 7, 1.80),
-                ]
+                # Column-wise (one sequence per column): apply_columns inserts
+                # every row in a single C call. NumPy arrays work here too.
+                products = ["Apple", "Banana", "Carrot", "Tomato", "Orange"]
+                categories = ["Fruit", "Fruit", "Vegetable", "Vegetable", "Fruit"]
+                quantities = array("i", [10, 15, 8, 12, 7])
+                prices = array("d", [1.50, 0.80, 1.20, 2.00, 1.80])
 
-                for product, category, quantity, price in sales:
-                    with Row(mt) as r:
-                        r.set_string(0, product)
-                        r.set_string(1, category)
-                        r.set_i32(2, quantity)
-                        r.set_f64(3, price)
-                        tbl.apply(r, check_dup=False)
+                tbl.apply_columns(mt, [products, categories, quantities, prices], check_dup=False)
 
                 groupbys = [groupby_new("category", "category", VARIANT_STRING)]
                 funcs = [
@@ -285,13 +264,16 @@ def tutorial_aggregate():
                 ]
 
                 with Aggregate.build("sales_by_category", groupbys, funcs) as agg:
-                    with tbl.find("") as c:
-                        for rowid in c:
-                            agg.row(tbl.read(rowid))
+                    # Filter in the cursor (C side) so rows without a group key
+                    # are never read into Python. FlintDB has no IS [NOT] NULL;
+                    # <> NULL is the supported spelling.
+                    with tbl.find("WHERE category <> NULL") as c:
+                        agg.ingest_cursor(c)
 
                     print("\nAggregation results (by category):")
-                    for r in agg.compute():
-                        print_row(r)
+                    results = agg.compute()
+                    print_rows(results)
+                    for r in results:
                         r.close()
 
         print("\nSuccessfully performed aggregation.\n")
@@ -312,28 +294,28 @@ def tutorial_flintdb_sql_exec():
     try:
         # 1. Create table using API
         print("Creating table with API...")
-        with Meta(tablename) as mt:
-            mt.add_column("id", VARIANT_INT64, spec=SPEC_NOT_NULL, default="0", comment="Employee ID")
-            mt.add_column("name", VARIANT_STRING, size=50, spec=SPEC_NOT_NULL, comment="Employee name")
-            mt.add_column("department", VARIANT_STRING, size=30, spec=SPEC_NOT_NULL, comment="Department")
-            mt.add_column("salary", VARIANT_DOUBLE, spec=SPEC_NOT_NULL, default="0.0", comment="Salary")
-            mt.add_index(PRIMARY_NAME.decode(), None, ["id"])
-            
+        with Meta.from_schema(tablename, [
+            Column("id", VARIANT_INT64, spec=SPEC_NOT_NULL, default="0", comment="Employee ID"),
+            Column("name", VARIANT_STRING, size=50, spec=SPEC_NOT_NULL, comment="Employee name"),
+            Column("department", VARIANT_STRING, size=30, spec=SPEC_NOT_NULL, comment="Department"),
+            Column("salary", VARIANT_DOUBLE, spec=SPEC_NOT_NULL, default="0.0", comment="Salary"),
+        ], indexes=[(PRIMARY_NAME.decode(), None, ["id"])]) as mt:
             # Open and close table to create it
             with Table(tablename, FLINTDB_RDWR, mt):
                 pass
         
         # 2. Insert data via SQL
         print("Executing SQL INSERT...")
-        insert_sqls = [
-            "INSERT INTO ./temp/tutorial_employees.flintdb VALUES (1, 'Alice', 'Engineering', 75000.0)",
-            "INSERT INTO ./temp/tutorial_employees.flintdb VALUES (2, 'Bob', 'Sales', 65000.0)",
-            "INSERT INTO ./temp/tutorial_employees.flintdb VALUES (3, 'Charlie', 'Engineering', 80000.0)",
+        insert = sql_prepare("INSERT INTO ./temp/tutorial_employees.flintdb VALUES (?, ?, ?, ?)")
+        employees = [
+            (1, "Alice", "Engineering", 75000.0),
+            (2, "Bob", "Sales", 65000.0),
+            (3, "Charlie", "Engineering", 80000.0),
         ]
         
         total_affected = 0
-        for sql in insert_sqls:
-            with sql_exec(sql) as res:
+        for params in employees:
+            with sql_bind_exec(insert, params) as res:
                 total_affected += res.affected
 
         print(f"Affected rows: {total_affected}")
@@ -354,6 +336,39 @@ def tutorial_flintdb_sql_exec():
         return -1
 
 
+def _run_chain(chain):
+    # Run dependent tutorials in order; returns the first that failed, or None.
+    for tutorial in chain:
+        if tutorial() != 0:
+            return tutorial
+    return None
+
+
+def main_parallel():
+    """Run independent tutorial chains on threads (output interleaves).
+
+    The chains touch separate files, and the GIL is released inside every
+    FlintDB call, so their C work overlaps.
+    """
+    ensure_temp_dir()
+
+    chains = [
+        [tutorial_table_create, tutorial_table_find, tutorial_table_update_delete],
+        [tutorial_tsv_create, tutorial_tsv_find],
+        [tutorial_filesort],
+        [tutorial_aggregate],
+        [tutorial_flintdb_sql_exec],
+    ]
+    failed = [t for t in run_concurrently([lambda c=c: _run_chain(c) for c in chains]) if t is not None]
+    for tutorial in failed:
+        print(f"Tutorial {tutorial.__name__} failed!", file=sys.stderr)
+    if failed:
+        return 1
+
+    print("All tutorial steps completed successfully.")
+    return 0
+
+
 def main():
     """Main function to run all tutorials"""
     ensure_temp_dir()
@@ -380,4 +395,4 @@ def main():
 
 
 if __name__ == "__main__":
-    sys.exit(main())
+    sys.exit(main_parallel() if "--parallel" in sys.argv[1:] else main())